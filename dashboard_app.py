@@ -1,24 +1,46 @@
 import dash
-from dash import dcc, html, Input, Output, State, callback
+from dash import dcc, html, Input, Output, State, callback, ctx, MATCH, Patch
 import dash_bootstrap_components as dbc
 import dash_ag_grid as dag
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import os
 import glob
+import base64
+import json
+import uuid
+import zlib
 import threading
-import time
+import collections
+import concurrent.futures
 from datetime import datetime
+from functools import lru_cache
+import logging
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError: # Optional: NumPy fallbacks are used without it
+    HAS_NUMBA = False
+
 from preprocess_hourly import preprocess_month
-from expand_timeline import download_file
+from model.core.fast_spline import natural_cubic_spline
+from model.core.surface_grid import bin_iv_surface
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
 # --- Configuration & Theme ---
 EXTERNAL_STYLESHEETS = [dbc.themes.BOOTSTRAP] 
 
 # --- Global Status for Harvesting ---
-PROCESS_LOG_BUFFER = []
+PROCESS_LOG_BUFFER = collections.deque(maxlen=500) # Newest first (appendleft); oldest lines drop off the right in O(1)
 IS_PROCESSING = False
 SHOULD_STOP = False
 STATUS_DATA = {
@@ -31,9 +53,12 @@ STATUS_DATA = {
     "downloaded": "0",
     "total": "0"
 }
+# STATUS_DATA is never mutated in place: the harvester publishes a fresh dict
+# and rebinds it under this lock, readers grab the reference once.
+STATUS_LOCK = threading.Lock()
 
 def background_logger(msg):
-    global PROCESS_LOG_BUFFER, STATUS_DATA
+    global STATUS_DATA
     
     # Check if this is a structured status update
     if msg.startswith("PROGRESS:"):
@@ -50,7 +75,8 @@ def background_logger(msg):
             downloaded = parts[5] if len(parts) > 5 else "0"
             total = parts[6] if len(parts) > 6 else "0"
 
-            STATUS_DATA.update({
+            new_status = {
+                **STATUS_DATA,
                 "date": date,
                 "stage": stage,
                 "progress": float(progress),
@@ -58,7 +84,9 @@ def background_logger(msg):
                 "file": filename,
                 "downloaded": downloaded,
                 "total": total
-            })
+            }
+            with STATUS_LOCK:
+                STATUS_DATA = new_status
             return # Don't log progress spam
         except:
             pass
@@ -67,65 +95,69 @@ def background_logger(msg):
     if not clean_msg.endswith('\n'):
         clean_msg += '\n'
     
-    PROCESS_LOG_BUFFER.append(clean_msg)
-    if len(PROCESS_LOG_BUFFER) > 500: 
-        PROCESS_LOG_BUFFER.pop(0)
+    PROCESS_LOG_BUFFER.appendleft(clean_msg)
 
-from harvest_manager import DataHarvester, STAGING_DIR, PROCESSED_DIR
+from harvest_manager import DataHarvester, DOWNLOAD_WORKERS, DOWNLOAD_ATTEMPTS, STAGING_DIR, PROCESSED_DIR
 
 app = dash.Dash(__name__, external_stylesheets=EXTERNAL_STYLESHEETS, suppress_callback_exceptions=True)
 app.title = "Deribit Options Analytics"
 
 # --- Data Loading helpers ---
+
+# Directory listings are cached until a directory's mtime changes (file added/removed)
+_RAW_FILES_CACHE = {'sig': None, 'val': None}
+_META_CACHE = {'sig': None, 'val': None}
+
+def _dir_signature(*dirs):
+    sig = []
+    for d in dirs:
+        try:
+            sig.append(os.stat(d).st_mtime_ns)
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+def invalidate_metadata_cache():
+    _RAW_FILES_CACHE['sig'] = None
+    _META_CACHE['sig'] = None
+
 def get_available_raw_files():
+    sig = _dir_signature("archives_all_years")
+    if sig == _RAW_FILES_CACHE['sig']:
+        return _RAW_FILES_CACHE['val']
     files = glob.glob("archives_all_years/TARDIS_Snap_*.csv.gz")
-    return sorted([os.path.basename(f) for f in files])
+    _RAW_FILES_CACHE['val'] = sorted([os.path.basename(f) for f in files])
+    _RAW_FILES_CACHE['sig'] = sig
+    return _RAW_FILES_CACHE['val']
 
 # --- Data Discovery ---
 
 def get_processed_metadata():
     """Returns a dict of available data: {currency: {year: [months]}}"""
-    files = glob.glob(os.path.join(PROCESSED_DIR, "*.parquet"))
-    metadata = {}
-    for f in files:
-        # Format: BTC_2021-02.parquet
-        base = os.path.basename(f).replace(".parquet", "")
-        parts = base.split("_")
-        if len(parts) != 2: continue
-        currency = parts[0]
-        date_parts = parts[1].split("-")
-        if len(date_parts) != 2: continue
-        year = date_parts[0]
-        month = date_parts[1]
-        
-        if currency not in metadata: metadata[currency] = {}
-        if year not in metadata[currency]: metadata[currency][year] = []
-        metadata[currency][year].append(month)
+    sig = _dir_signature(PROCESSED_DIR, STAGING_DIR)
+    if sig == _META_CACHE['sig']:
+        return _META_CACHE['val']
+    _META_CACHE['val'] = _scan_processed_metadata()
+    _META_CACHE['sig'] = sig
+    return _META_CACHE['val']
+
+def _scan_processed_metadata():
+    # Monthly parquets (BTC_2021-02.parquet) and staging days (BTC_2021-01-01.snap)
+    names = [os.path.basename(f)[:-len(".parquet")] for f in glob.glob(os.path.join(PROCESSED_DIR, "*.parquet"))]
+    names += [os.path.basename(f)[:-len(".snap")] for f in glob.glob(os.path.join(STAGING_DIR, "*.snap"))]
+    if not names:
+        return {}
     
-    # Merge with staging files (individual days)
-    staging_files = glob.glob(os.path.join(STAGING_DIR, "*.snap"))
-    for f in staging_files:
-        base = os.path.basename(f).replace(".snap", "")
-        parts = base.split("_")
-        if len(parts) != 2: continue
-        currency = parts[0]
-        date_str = parts[1] # 2021-01-01
-        year = date_str[:4]
-        month_part = date_str[5:7]
-        
-        if currency not in metadata: metadata[currency] = {}
-        if year not in metadata[currency]: metadata[currency][year] = []
-        if month_part not in metadata[currency][year]:
-            metadata[currency][year].append(month_part)
+    # One vectorized parse, then unique + sorted (currency, year, month) rows
+    parts = pd.Series(names).str.extract(r'^([^_]+)_(\d{4})-(\d{2})(?:-\d{2})?$').dropna()
+    parts = parts.drop_duplicates().sort_values([0, 1, 2])
     
-    # Sort years and months
-    for curr in metadata:
-        for yr in metadata[curr]:
-            # Ensure unique months and sort numerically as strings
-            metadata[curr][yr] = sorted(list(set(metadata[curr][yr])), key=lambda x: int(x) if x.isdigit() else 0)
+    metadata = {}
+    for (currency, year), months in parts.groupby([0, 1], sort=False)[2]:
+        metadata.setdefault(currency, {})[year] = months.tolist()
     return metadata
 
-def load_processed_file(currency, year, month):
+def _resolve_path(currency, year, month):
     # 1. Try monthly parquet
     filepath = os.path.join(PROCESSED_DIR, f"{currency}_{year}-{month}.parquet")
     if not os.path.exists(filepath):
@@ -135,30 +167,118 @@ def load_processed_file(currency, year, month):
     if not os.path.exists(filepath):
         # 3. Try any other snap for that month in staging
         snaps = glob.glob(os.path.join(STAGING_DIR, f"{currency}_{year}-{month}-*.snap"))
-        if snaps:
-            filepath = snaps[0]
-        else:
-            return pd.DataFrame()
-            
-    try:
-        df = pd.read_parquet(filepath)
-        if df.empty: return df
-        if not pd.api.types.is_datetime64_any_dtype(df['snapshot_time']):
-            df['snapshot_time'] = pd.to_datetime(df['snapshot_time'])
-        df['currency'] = df['symbol'].str.split('-').str[0]
-        
-        # Consistent expiry parsing
+        if not snaps:
+            return None
+        filepath = snaps[0]
+    return filepath
+
+# Columns read by the analyzer tabs (KPIs, overview, board, 3D); the rest stay on disk
+_NEEDED_COLS = [
+    'snapshot_time', 'symbol', 'type', 'expiration', 'strike_price',
+    'underlying_price', 'mark_iv', 'open_interest',
+    'bid_price', 'ask_price', 'bid_iv', 'delta', 'gamma', 'vega', 'theta',
+    'currency', 'expiration_str' # written by the pipeline since add_derived_columns
+]
+
+@lru_cache(maxsize=32)
+def _load_cached(filepath, mtime):
+    """Reads + derives columns for one file. `mtime` is part of the key so rewrites invalidate."""
+    # Memory-mapped: repeat loads are served from the OS page cache, shared across threads
+    source = pa.memory_map(filepath, 'r')
+    available = set(pq.read_schema(source).names)
+    columns = [c for c in _NEEDED_COLS if c in available]
+    tbl = pq.read_table(source, columns=columns, use_threads=True, pre_buffer=True)
+    if tbl.num_rows == 0: return tbl.to_pandas()
+    
+    # Legacy files lack the derived columns: compute them in Arrow (vectorized C) before conversion
+    if 'currency' not in tbl.column_names:
+        currency = pc.extract_regex(tbl.column('symbol'), r'^(?P<c>[^-]+)')
+        tbl = tbl.append_column('currency', pc.struct_field(currency, [0]))
+    
+    # Consistent expiry parsing (Deribit 'expiration' is epoch microseconds)
+    exp_type = tbl.schema.field('expiration').type
+    if 'expiration_str' not in tbl.column_names and (pa.types.is_integer(exp_type) or pa.types.is_timestamp(exp_type)):
+        exp_date = pc.cast(tbl.column('expiration'), pa.timestamp('us'))
+        tbl = tbl.append_column('expiration_date', exp_date)
+        tbl = tbl.append_column('expiration_str', pc.utf8_upper(pc.strftime(exp_date, format='%d%b%y')))
+    
+    df = tbl.to_pandas()
+    if not pd.api.types.is_datetime64_any_dtype(df['snapshot_time']):
+        df['snapshot_time'] = pd.to_datetime(df['snapshot_time'])
+    if 'expiration_str' not in df.columns:
+        # Legacy files with float/string expirations
         try:
             df['expiration_date'] = pd.to_datetime(df['expiration'], unit='us')
         except:
             df['expiration_date'] = pd.to_datetime(df['expiration'])
-            
         df['expiration_str'] = df['expiration_date'].dt.strftime('%d%b%y').str.upper()
-        return df.sort_values('snapshot_time')
+    return df.sort_values('snapshot_time')
+
+def load_processed_file(currency, year, month):
+    filepath = _resolve_path(currency, year, month)
+    if filepath is None:
+        return pd.DataFrame()
+            
+    try:
+        # Shallow copy so callers can add/replace columns without polluting the cache
+        return _load_cached(filepath, os.path.getmtime(filepath)).copy(deep=False)
     except Exception as e:
         print(f"Error loading {filepath}: {e}")
         return pd.DataFrame()
 
+# --- Store transport (Arrow IPC) ---
+
+# Dictionary-encoded in the Store: each value repeats once per hourly snapshot
+_DICT_COLS = ['symbol', 'type', 'currency', 'expiration_str']
+
+# Decoded tables of keyed payloads: the monthly Store comes back on every slider tick
+_DECODED_STORE_CACHE = collections.OrderedDict()
+_DECODED_STORE_LOCK = threading.Lock()
+_DECODED_STORE_MAX = 4
+
+def _table_to_store(tbl, key=None):
+    """Serializes an Arrow table into a JSON-safe Store payload (LZ4 IPC stream, base64).
+
+    Payloads given a `key` are decoded once per server process, see _table_from_store.
+    """
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression='lz4')
+    with pa.ipc.new_stream(sink, tbl.schema, options=options) as writer:
+        writer.write_table(tbl)
+    return {"ipc": base64.b64encode(sink.getvalue().to_pybytes()).decode('ascii'), "key": key}
+
+def _table_from_store(data):
+    """Inverse of _table_to_store: returns the pyarrow Table held in a Store payload."""
+    key = data.get("key")
+    if key is not None:
+        with _DECODED_STORE_LOCK:
+            if key in _DECODED_STORE_CACHE:
+                _DECODED_STORE_CACHE.move_to_end(key)
+                return _DECODED_STORE_CACHE[key]
+    
+    tbl = pa.ipc.open_stream(base64.b64decode(data["ipc"])).read_all()
+    if key is not None:
+        with _DECODED_STORE_LOCK:
+            _DECODED_STORE_CACHE[key] = tbl
+            while len(_DECODED_STORE_CACHE) > _DECODED_STORE_MAX:
+                _DECODED_STORE_CACHE.popitem(last=False)
+    return tbl
+
+def _build_snapshot_index(ts):
+    """Row offsets of each snapshot given sorted int64 ns snapshot times.
+
+    Snapshot i occupies rows offsets[i]:offsets[i+1], so a slider tick becomes
+    a table slice instead of a full-month scan.
+    """
+    ts_unique, first_idx = np.unique(ts, return_index=True)
+    return {"ts": ts_unique.tolist(), "offsets": first_idx.tolist() + [len(ts)]}
+
+def _sort_expiries(values):
+    """Orders DDMMMYY expiration strings chronologically with one vectorized parse."""
+    exp_arr = np.asarray(values, dtype=object)
+    order = pd.to_datetime(exp_arr, format='%d%b%y', errors='coerce').argsort()
+    return exp_arr[order].tolist()
+
 # --- Custom Styling (The "10/10" Pale Look) ---
 CUSTOM_CSS = {
     "background": "#F5F7F9",
@@ -208,7 +328,21 @@ def build_control_dock():
     return html.Div([
         dbc.Row([
             dbc.Col(id="slider-container", children=[
-                html.Div(dcc.Slider(id="time-slider", min=0, max=1, value=0), style={"display": "none"})
+                html.Small("No time data available.", id="slider-empty-note", className="text-muted"),
+                # Configured in the browser from monthly-snapshot-index (see SLIDER_FROM_INDEX_JS)
+                html.Div([
+                    html.Div("TIME SNAPSHOT SELECTOR", style={"fontSize": "10px", "fontWeight": "bold", "color": CUSTOM_CSS["text_secondary"], "marginBottom": "5px"}),
+                    dcc.Slider(
+                        id='time-slider',
+                        min=0,
+                        max=1,
+                        step=1,
+                        value=0,
+                        marks={},
+                        updatemode='drag',
+                        tooltip={"placement": "top", "always_visible": True, "template": "{value}"} # Note: JS formatting would be better for date
+                    )
+                ], id="slider-body", style={"display": "none"})
             ], width=11),
             dbc.Col([
                 dbc.Button("▶", id="btn-play", color="light", size="sm", style={"borderRadius": "50%", "width": "35px", "height": "35px"})
@@ -240,7 +374,11 @@ app.layout = html.Div([
     dcc.Store(id='current-snapshot-data'),
     dcc.Store(id='active-board-expiry'),
     dcc.Store(id='full-monthly-data'), # All snapshots for the selected month
+    dcc.Store(id='monthly-snapshot-index'), # Sorted unique snapshot_time (ns), row offsets into full-monthly-data, ordered expiries
+    dcc.Store(id='slider-throttled', data=0), # time-slider value, forwarded at most every SLIDER_THROTTLE_MS
     dcc.Store(id='available-metadata-store', data=get_processed_metadata()),
+    dcc.Store(id='metadata-sig-store', data=None), # Dir signature this client last received
+    dcc.Store(id='overview-render-sig', data=None), # Trace names/hashes of the overview currently shown
     dcc.Interval(id='loader-interval', interval=2000, n_intervals=0, disabled=False),
     
     dbc.Tabs([
@@ -502,7 +640,8 @@ def update_month_selector(currency, year, metadata):
     return [{"label": m, "value": m} for m in months], months[0]
 
 @callback(
-    Output("full-monthly-data", "data"),
+    [Output("full-monthly-data", "data"),
+     Output("monthly-snapshot-index", "data")],
     [Input("currency-selector", "value"),
      Input("year-selector", "value"),
      Input("month-selector", "value")],
@@ -510,96 +649,123 @@ def update_month_selector(currency, year, metadata):
 )
 def load_monthly_data_to_store(currency, year, month):
     if not all([currency, year, month]) or month == 'none':
-        return [] # Explicitly clear store
+        return [], None # Explicitly clear store
     df_month = load_processed_file(currency, year, month)
     if df_month.empty:
-        return []
+        return [], None
     
-    # CRITICAL: Convert Timestamps to strings for JSON serialization in Store
-    for col in df_month.columns:
-        if pd.api.types.is_datetime64_any_dtype(df_month[col]):
-            df_month[col] = df_month[col].dt.strftime('%Y-%m-%d %H:%M:%S')
-            
-    # Convert to JSON serializable list
-    return df_month.to_dict('records')
-
-@callback(
-    Output("slider-container", "children"),
-    [Input("full-monthly-data", "data")]
-)
-def update_slider(data):
-    if not data:
-        return html.Div([
-            html.Small("No time data available.", className="text-muted"),
-            html.Div(dcc.Slider(id="time-slider", min=0, max=1, value=0), style={"display": "none"})
-        ])
+    # Contiguous snapshots: the index store maps slider position -> row range
+    df_month = df_month.sort_values(['snapshot_time', 'currency'], kind='stable', ignore_index=True)
     
-    df_temp = pd.DataFrame(data)
-    if 'snapshot_time' not in df_temp.columns:
-        return html.Div([
-            html.Small("Invalid data format.", className="text-muted"),
-            html.Div(dcc.Slider(id="time-slider", min=0, max=1, value=0), style={"display": "none"})
-        ])
-        
-    df_temp['snapshot_time'] = pd.to_datetime(df_temp['snapshot_time'])
-    timestamps = sorted(df_temp['snapshot_time'].unique())
-    ts_str = [ts.strftime("%H:%M") for ts in timestamps]
-    ts_full = [ts.strftime("%d %b %H:%M") for ts in timestamps]
+    # snapshot_time travels as int64 ns and is only turned into a date where displayed;
+    # expiration_date was just the intermediate for expiration_str
+    ts_ns = df_month['snapshot_time'].to_numpy().astype('datetime64[ns]').astype('int64')
+    df_store = df_month.drop(columns=['expiration_date'], errors='ignore').assign(snapshot_time=ts_ns)
+    tbl = pa.Table.from_pandas(df_store, preserve_index=False)
     
-    max_idx = len(timestamps) - 1
-    marks = {i: {'label': ts, 'style': {'fontSize': '10px', 'color': '#95A5A6'}} 
-             for i, ts in enumerate(ts_str) if i % (max(1, len(ts_str)//10)) == 0} 
-
-    return [
-        html.Div("TIME SNAPSHOT SELECTOR", style={"fontSize": "10px", "fontWeight": "bold", "color": CUSTOM_CSS["text_secondary"], "marginBottom": "5px"}),
-        dcc.Slider(
-            id='time-slider',
-            min=0,
-            max=max_idx,
-            step=1,
-            value=0,
-            marks=marks,
-            updatemode='drag',
-            tooltip={"placement": "top", "always_visible": True, "template": "{value}"} # Note: JS formatting would be better for date
-        )
-    ]
+    # Low-cardinality strings travel as dictionary indices (arrive as categoricals)
+    for name in _DICT_COLS:
+        i = tbl.schema.get_field_index(name)
+        if i >= 0 and not pa.types.is_dictionary(tbl.schema.field(i).type):
+            tbl = tbl.set_column(i, name, pc.dictionary_encode(tbl.column(name)))
+    
+    index = _build_snapshot_index(ts_ns)
+    index["expiries"] = _sort_expiries(df_month['expiration_str'].unique())
+    
+    # Unique per load so update_global_data decodes this month once, not on every tick
+    return _table_to_store(tbl, key=uuid.uuid4().hex), index
+
+# Slider marks only reformat the index the browser already holds - no server round-trip.
+# Timestamps are naive (stored as UTC ns), hence the getUTC* accessors.
+SLIDER_FROM_INDEX_JS = """
+function(index) {
+    if (!index || !index.ts || index.ts.length === 0) {
+        return [{}, {"display": "none"}, {}, 1, 0];
+    }
+    const ts = index.ts;
+    const every = Math.max(1, Math.floor(ts.length / 10));
+    const pad = (v) => String(v).padStart(2, "0");
+    const marks = {};
+    for (let i = 0; i < ts.length; i += every) {
+        const d = new Date(ts[i] / 1e6);
+        marks[i] = {
+            "label": pad(d.getUTCHours()) + ":" + pad(d.getUTCMinutes()),
+            "style": {"fontSize": "10px", "color": "#95A5A6"}
+        };
+    }
+    return [{"display": "none"}, {}, marks, ts.length - 1, 0];
+}
+"""
+
+app.clientside_callback(
+    SLIDER_FROM_INDEX_JS,
+    [Output("slider-empty-note", "style"),
+     Output("slider-body", "style"),
+     Output("time-slider", "marks"),
+     Output("time-slider", "max"),
+     Output("time-slider", "value")],
+    [Input("monthly-snapshot-index", "data")]
+)
+
+# updatemode='drag' fires on every pixel; only forward the slider to the server at <= 20 Hz.
+# Leading edge passes through, the latest value inside the window is delivered by a trailing timer.
+SLIDER_THROTTLE_MS = 50
+SLIDER_THROTTLE_JS = """
+function(value) {
+    const t = window.__sliderThrottle = window.__sliderThrottle || {last: 0, timer: null};
+    const wait = %d - (Date.now() - t.last);
+    if (t.timer) {
+        clearTimeout(t.timer);
+        t.timer = null;
+    }
+    if (wait <= 0 || !window.dash_clientside.set_props) {
+        t.last = Date.now();
+        return value;
+    }
+    t.timer = setTimeout(function() {
+        t.last = Date.now();
+        t.timer = null;
+        window.dash_clientside.set_props("slider-throttled", {data: value});
+    }, wait);
+    return window.dash_clientside.no_update;
+}
+""" % SLIDER_THROTTLE_MS
+
+app.clientside_callback(
+    SLIDER_THROTTLE_JS,
+    Output("slider-throttled", "data"),
+    Input("time-slider", "value")
+)
 
 @callback(
     [Output('current-snapshot-data', 'data'),
      Output('expiry-selector', 'options'),
      Output('expiry-selector', 'value')],
     [Input('full-monthly-data', 'data'),
-     Input('time-slider', 'value'),
+     Input('monthly-snapshot-index', 'data'),
+     Input('slider-throttled', 'data'),
      Input('currency-selector', 'value')],
     [State('expiry-selector', 'value')]
 )
-def update_global_data(full_data, slider_value, currency, current_selected):
-    if not full_data or slider_value is None:
+def update_global_data(full_data, index, slider_value, currency, current_selected):
+    if not full_data or not index or slider_value is None:
         return [], [], []
     
-    df_month = pd.DataFrame(full_data)
-    df_month['snapshot_time'] = pd.to_datetime(df_month['snapshot_time'])
-    
-    timestamps = sorted(df_month['snapshot_time'].unique())
-    if slider_value >= len(timestamps):
+    offsets = index["offsets"]
+    if slider_value >= len(offsets) - 1:
         slider_value = 0
     
-    current_ts = timestamps[slider_value]
+    # O(snapshot) slice of the pre-sorted month instead of a full-table mask
+    start = offsets[slider_value]
+    tbl = _table_from_store(full_data).slice(start, offsets[slider_value + 1] - start)
+    tbl = tbl.filter(pc.is_in(tbl.column('currency'), value_set=pa.array([currency])))
     
-    snapshot = df_month[
-        (df_month['snapshot_time'] == current_ts) & 
-        (df_month['currency'] == currency)
-    ].copy()
-    
-    if snapshot.empty:
+    if tbl.num_rows == 0:
         return [], [], []
     
-    # Use formatted string for display
-    def parse_date(x):
-        try: return datetime.strptime(x, '%d%b%y')
-        except: return datetime.min
-
-    expirations = sorted(snapshot['expiration_str'].unique(), key=parse_date)
+    # Month-wide order is precomputed; keep the expiries listed in this snapshot
+    present = set(tbl.column('expiration_str').to_pandas().unique())
+    expirations = [e for e in index["expiries"] if e in present]
     
     # Create toggle options
     exp_options = [{'label': exp, 'value': exp} for exp in expirations]
@@ -614,13 +780,36 @@ def update_global_data(full_data, slider_value, currency, current_selected):
     else:
         new_selection = expirations[:3] if len(expirations) >= 3 else expirations
     
-    print(f"DEBUG: Previous selection: {current_selected} -> New selection: {new_selection}")
-    
-    snapshot['snapshot_time'] = snapshot['snapshot_time'].dt.strftime('%Y-%m-%d %H:%M:%S')
-    if 'expiration_date' in snapshot.columns:
-        snapshot['expiration_date'] = snapshot['expiration_date'].astype(str)
+    logger.debug("Expiry selection: %s -> %s", current_selected, new_selection)
     
-    return snapshot.to_dict('records'), exp_options, new_selection
+    # The snapshot stays columnar; consumers filter it in Arrow before going to pandas
+    return _table_to_store(tbl), exp_options, new_selection
+
+def _kpi_loop(strike, price, mark_iv, oi, is_put):
+    # Single fused pass: closest strike (ATM IV) + put/call OI sums (NaN OI skipped like pandas)
+    best_d = np.inf
+    best_i = 0
+    puts = 0.0
+    calls = 0.0
+    for i in range(strike.shape[0]):
+        d = abs(strike[i] - price[i])
+        if d < best_d:
+            best_d = d
+            best_i = i
+        if oi[i] == oi[i]:
+            if is_put[i]:
+                puts += oi[i]
+            else:
+                calls += oi[i]
+    return mark_iv[best_i], (puts / calls) if calls > 0 else 0.0
+
+def _kpi_numpy(strike, price, mark_iv, oi, is_put):
+    iv = mark_iv[int(np.nanargmin(np.abs(strike - price)))]
+    puts = np.nansum(oi[is_put])
+    calls = np.nansum(oi[~is_put])
+    return iv, (puts / calls) if calls > 0 else 0.0
+
+_kpi = njit(cache=True)(_kpi_loop) if HAS_NUMBA else _kpi_numpy
 
 @callback(
     [Output('kpi-underlying', 'children'),
@@ -630,78 +819,121 @@ def update_global_data(full_data, slider_value, currency, current_selected):
 )
 def update_kpis(data):
     if not data: return "-", "-", "-"
-    df_snap = pd.DataFrame(data)
+    df_snap = _table_from_store(data).to_pandas()
     if df_snap.empty: return "-", "-", "-"
     
     price = df_snap['underlying_price'].iloc[0]
     
-    # Simple ATM IV approximation
+    # Simple ATM IV approximation (closest strike) + put/call OI ratio in one kernel call
     try:
-        # Find nearest expiry + closest strike
-        price_col = 'underlying_price'
-        df_snap['dist'] = (df_snap['strike_price'] - df_snap[price_col]).abs()
-        atm_row = df_snap.sort_values('dist').iloc[0]
-        iv = atm_row['mark_iv']
+        iv, pcr = _kpi(
+            df_snap['strike_price'].to_numpy(dtype=np.float64),
+            df_snap['underlying_price'].to_numpy(dtype=np.float64),
+            df_snap['mark_iv'].to_numpy(dtype=np.float64),
+            df_snap['open_interest'].to_numpy(dtype=np.float64),
+            (df_snap['type'] == 'put').to_numpy(dtype=np.bool_)
+        )
     except:
-        iv = 0
-        
-    puts = df_snap[df_snap['type'] == 'put']['open_interest'].sum()
-    calls = df_snap[df_snap['type'] == 'call']['open_interest'].sum()
-    pcr = puts / calls if calls > 0 else 0
+        iv, pcr = 0, 0
     
     return f"${price:,.2f}", f"{pcr:.2f}", f"{iv:.2f}%"
 
 
 @callback(
-    Output('tab-content', 'children'),
+    [Output('tab-content', 'children'),
+     Output('overview-render-sig', 'data')],
     [Input('main-tabs', 'active_tab'),
      Input('current-snapshot-data', 'data'),
      Input('expiry-selector', 'value')],
-    [State('active-board-expiry', 'data')]
+    [State('active-board-expiry', 'data'),
+     State('overview-render-sig', 'data')]
 )
-def render_tab_content(active_tab, data, selected_expiries, stored_board_expiry):
-    if not data: return html.Div("Loading Data...")
-    df_snap = pd.DataFrame(data)
-    if df_snap.empty: return html.Div("No data.")
+def render_tab_content(active_tab, data, selected_expiries, stored_board_expiry, prior_sig):
+    if not data: return html.Div("Loading Data..."), None
+    tbl = _table_from_store(data)
+    if tbl.num_rows == 0: return html.Div("No data."), None
+
+    if active_tab == "tab-3d":
+        return render_3d_tab(tbl), None
 
+    # Filter in Arrow (single pass over dictionary indices); the tabs materialize what they read
     if selected_expiries:
-        df_filtered = df_snap[df_snap['expiration_str'].isin(selected_expiries)]
+        mask = pc.is_in(tbl.column('expiration_str'), value_set=pa.array(selected_expiries))
+        tbl_filtered = tbl.filter(mask)
     else:
-        df_filtered = df_snap
-        selected_expiries = df_filtered['expiration_str'].unique()
+        tbl_filtered = tbl
+        selected_expiries = tbl.column('expiration_str').to_pandas().unique().tolist()
         
     if active_tab == "tab-overview":
-        return render_overview_tab(df_filtered)
+        fig_smile, fig_oi = overview_figures(tbl_filtered)
+        sig = _overview_signature(fig_smile, fig_oi)
+        # Slider tick over the same set of traces: ship only the traces whose data moved
+        if set(ctx.triggered_prop_ids) == {'current-snapshot-data.data'} and prior_sig and prior_sig['names'] == sig['names']:
+            return _patch_overview(fig_smile, fig_oi, sig, prior_sig), sig
+        return render_overview_tab(fig_smile, fig_oi), sig
     elif active_tab == "tab-board":
-        return render_board_tab(df_filtered, selected_expiries, stored_board_expiry)
-    elif active_tab == "tab-3d":
-        return render_3d_tab(df_snap)
-    return html.Div("Unknown Tab")
+        return render_board_tab(tbl_filtered, selected_expiries, stored_board_expiry), None
+    return html.Div("Unknown Tab"), None
+
+def _select_to_pandas(tbl, columns):
+    """Projects an Arrow table onto the columns a tab reads, then converts to pandas."""
+    return tbl.select([c for c in columns if c in tbl.column_names]).to_pandas()
+
+@lru_cache(maxsize=512)
+def _spline_xy(strikes, ivs):
+    """200-point natural cubic spline through (strikes, ivs) tuples; None if it cannot be fitted.
 
-def render_overview_tab(df_filtered):
+    Cached: redraws of an unchanged expiry (tab switches, expiry toggles) skip the fit.
+    """
+    try:
+        x, y = np.asarray(strikes, dtype=np.float64), np.asarray(ivs, dtype=np.float64)
+        if x.size < 3 or not np.all(np.diff(x) > 0): # Two points: the caller's straight line is the same curve
+            return None
+        x_new = np.linspace(x.min(), x.max(), 200)
+        return x_new, natural_cubic_spline(x, y, x_new)
+    except:
+        return None
+
+def overview_figures(tbl_filtered):
+    df_filtered = _select_to_pandas(tbl_filtered, ['expiration_str', 'type', 'strike_price', 'mark_iv', 'open_interest', 'underlying_price'])
+    
     # Sort
     df_sorted = df_filtered.sort_values(by=['expiration_str', 'strike_price'])
     
-    from scipy.interpolate import make_interp_spline
-    df_clean = df_sorted[df_sorted['mark_iv'] > 0].copy()
+    # Read-only below, so a plain mask selection (no defensive copy) is enough
+    df_clean = df_sorted[df_sorted['mark_iv'].to_numpy() > 0]
     fig_smile = go.Figure()
     
     if not df_clean.empty:
         expiries = df_clean['expiration_str'].unique()
         colors = px.colors.qualitative.Plotly
+        # Faint "actual" points of every expiry go into one WebGL trace; curves stay per expiry
+        actual_x, actual_y, actual_c = [], [], []
+        curves = []
         for i, exp in enumerate(expiries):
             df_exp = df_clean[df_clean['expiration_str'] == exp].sort_values('strike_price')
+            color = colors[i % len(colors)]
             if len(df_exp) < 4:
-                fig_smile.add_trace(go.Scatter(x=df_exp['strike_price'], y=df_exp['mark_iv'], mode='lines+markers', name=exp, line=dict(color=colors[i % len(colors)])))
+                curves.append(go.Scatter(x=df_exp['strike_price'], y=df_exp['mark_iv'], mode='lines+markers', name=exp, line=dict(color=color)))
                 continue
-            fig_smile.add_trace(go.Scatter(x=df_exp['strike_price'], y=df_exp['mark_iv'], mode='markers', name=f"{exp} (actual)", marker=dict(size=5, opacity=0.4, color=colors[i % len(colors)]), showlegend=False))
-            try:
-                x, y = df_exp['strike_price'].values, df_exp['mark_iv'].values
-                x_new = np.linspace(x.min(), x.max(), 200)
-                spl = make_interp_spline(x, y, k=3)
-                fig_smile.add_trace(go.Scatter(x=x_new, y=spl(x_new), mode='lines', name=exp, line=dict(color=colors[i % len(colors)], width=2)))
-            except:
-                fig_smile.add_trace(go.Scatter(x=df_exp['strike_price'], y=df_exp['mark_iv'], mode='lines', name=exp, line=dict(color=colors[i % len(colors)])))
+            strikes, ivs = df_exp['strike_price'].to_numpy(), df_exp['mark_iv'].to_numpy()
+            actual_x.append(strikes)
+            actual_y.append(ivs)
+            actual_c.append(np.full(len(strikes), color, dtype=object))
+            curve = _spline_xy(tuple(strikes), tuple(ivs))
+            if curve is not None:
+                x_new, y_new = curve
+                curves.append(go.Scatter(x=x_new, y=y_new, mode='lines', name=exp, line=dict(color=color, width=2)))
+            else:
+                curves.append(go.Scatter(x=strikes, y=ivs, mode='lines', name=exp, line=dict(color=color)))
+        
+        if actual_x:
+            fig_smile.add_trace(go.Scattergl(
+                x=np.concatenate(actual_x), y=np.concatenate(actual_y), mode='markers',
+                marker=dict(size=5, opacity=0.4, color=np.concatenate(actual_c)),
+                hoverinfo='skip', showlegend=False
+            ))
+        fig_smile.add_traces(curves)
 
     # Add vertical line for current underlying price
     current_price = df_filtered['underlying_price'].mean() if not df_filtered.empty else 0
@@ -728,12 +960,14 @@ def render_overview_tab(df_filtered):
     
     # 2. Open Interest - Use go.Figure to avoid px template issues in some environments
     fig_oi = go.Figure()
+    # One partitioning pass instead of a boolean mask per type
+    oi_groups = dict(tuple(df_sorted.groupby('type', sort=False, observed=True)[['strike_price', 'open_interest']]))
     for t in ['call', 'put']:
-        df_t = df_sorted[df_sorted['type'] == t]
-        if not df_t.empty:
+        df_t = oi_groups.get(t)
+        if df_t is not None and not df_t.empty:
             fig_oi.add_trace(go.Bar(
-                x=df_t['strike_price'],
-                y=df_t['open_interest'],
+                x=df_t['strike_price'].to_numpy(),
+                y=df_t['open_interest'].to_numpy(),
                 name=t.upper(),
                 marker_color=CUSTOM_CSS['accent_call'] if t == 'call' else CUSTOM_CSS['accent_put'],
                 opacity=0.7
@@ -752,43 +986,171 @@ def render_overview_tab(df_filtered):
          legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
 
+    return fig_smile, fig_oi
+
+def render_overview_tab(fig_smile, fig_oi):
+    # _patch_overview addresses the figures by position in this tree
     return html.Div([
         dbc.Row([dbc.Col(dcc.Graph(figure=fig_smile), width=12)]),
         dbc.Row([dbc.Col(dcc.Graph(figure=fig_oi), width=12)])
     ])
 
-def render_board_tab(df_filtered, selected_expiries, active_expiry=None):
+def _trace_hash(trace):
+    h = 0
+    for arr in (trace.x, trace.y):
+        if arr is not None:
+            h = zlib.crc32(np.ascontiguousarray(arr, dtype=np.float64).tobytes(), h)
+    return h
+
+def _overview_signature(*figs):
+    return {
+        "names": [[t.name for t in fig.data] for fig in figs],
+        "hashes": [[_trace_hash(t) for t in fig.data] for fig in figs],
+    }
+
+def _patch_overview(fig_smile, fig_oi, sig, prior_sig):
+    """Patch for the rendered overview Div: changed traces plus the price marker only."""
+    patch = Patch()
+    for row, fig in enumerate((fig_smile, fig_oi)):
+        # Div -> Row[row] -> Col -> Graph.figure
+        figure = patch['props']['children'][row]['props']['children'][0]['props']['children']['props']['figure']
+        for i, (new_h, old_h) in enumerate(zip(sig["hashes"][row], prior_sig["hashes"][row])):
+            if new_h != old_h:
+                figure['data'][i] = fig.data[i].to_plotly_json()
+        figure['layout']['shapes'] = [sh.to_plotly_json() for sh in fig.layout.shapes]
+        figure['layout']['annotations'] = [a.to_plotly_json() for a in fig.layout.annotations]
+    return patch
+
+def _records(df):
+    """Row dicts for AgGrid: pandas' C JSON writer + C json parser, no per-cell boxing."""
+    return json.loads(df.to_json(orient='records', double_precision=10))
+
+# Per-side columns shown by the options board (joined as <field>_c / <field>_p)
+_BOARD_FIELDS = ['strike_price', 'theta', 'vega', 'gamma', 'delta', 'bid_iv', 'bid_price', 'ask_price']
+
+# Board frames served page by page to AgGrid's infinite row model, keyed by grid index
+# "<currency>|<snapshot ns>|<expiry>": re-renders of the same snapshot reuse their frame,
+# and an evicted frame is rebuilt from the current snapshot on the next page request
+_BOARD_ROWS = collections.OrderedDict()
+_BOARD_ROWS_LOCK = threading.Lock()
+_BOARD_ROWS_MAX = 64
+
+_NUMBER_FILTERS = {
+    'equals': lambda s, f: s == f['filter'],
+    'notEqual': lambda s, f: s != f['filter'],
+    'lessThan': lambda s, f: s < f['filter'],
+    'lessThanOrEqual': lambda s, f: s <= f['filter'],
+    'greaterThan': lambda s, f: s > f['filter'],
+    'greaterThanOrEqual': lambda s, f: s >= f['filter'],
+    'inRange': lambda s, f: s.between(f['filter'], f['filterTo']),
+}
+
+# Display formats applied server-side to each served page (was a d3 valueFormatter per cell)
+_BOARD_FORMATS = {'theta': '{:,.2f}', 'vega': '{:,.2f}', 'gamma': '{:,.6f}', 'delta': '{:,.2f}', 'bid_iv': '{:,.1f}'}
+
+def _format_board_page(page):
+    """Formats the greek/IV columns of a row slice; sort and filter stay on the numeric frame."""
+    page = page.copy()
+    for field, fmt in _BOARD_FORMATS.items():
+        for col in (f"{field}_c", f"{field}_p"):
+            if col in page.columns:
+                page[col] = [fmt.format(v) for v in page[col].to_numpy(dtype=np.float64)]
+    return page
+
+def _board_key(df_snap, exp):
+    """Deterministic grid index for one expiry of the snapshot held in df_snap."""
+    if df_snap.empty:
+        return f"||{exp}"
+    return f"{df_snap['currency'].iat[0]}|{int(df_snap['snapshot_time'].iat[0])}|{exp}"
+
+def _board_frame(df_exp):
+    """Calls and puts of one expiry joined per strike, with the ATM row flagged."""
+    # Only the grid fields: categorical columns would reject the fillna(0) below
+    fields = [c for c in _BOARD_FIELDS if c in df_exp.columns]
+    calls = df_exp.loc[df_exp['type'] == 'call', fields].set_index('strike_price')
+    puts = df_exp.loc[df_exp['type'] == 'put', fields].set_index('strike_price')
+    
+    combined = calls.join(puts, how='outer', lsuffix='_c', rsuffix='_p').reset_index()
+    combined.fillna(0, inplace=True)
+    
+    # Calculate ATM strike (O(N) argmin, no sort)
+    strikes_np = combined['strike_price'].to_numpy()
+    underlying = float(df_exp['underlying_price'].iat[0]) if not df_exp.empty else 0
+    atm_strike = float(strikes_np[np.abs(strikes_np - underlying).argmin()]) if strikes_np.size else 0
+    # Flag computed once here; the row style tests an int instead of comparing floats per row
+    combined['is_atm'] = (strikes_np == atm_strike).astype('int8')
+    return combined
+
+def _register_board_rows(key, df_exp):
+    """Frame for key, built from df_exp only if it is not cached already."""
+    with _BOARD_ROWS_LOCK:
+        combined = _BOARD_ROWS.get(key)
+        if combined is not None:
+            _BOARD_ROWS.move_to_end(key)
+            return combined
+    combined = _board_frame(df_exp)
+    with _BOARD_ROWS_LOCK:
+        _BOARD_ROWS[key] = combined
+        while len(_BOARD_ROWS) > _BOARD_ROWS_MAX:
+            _BOARD_ROWS.popitem(last=False)
+    return combined
+
+_BOARD_READ_COLS = ['snapshot_time', 'currency', 'expiration_str', 'type', 'underlying_price'] + _BOARD_FIELDS
+
+@callback(
+    Output({"type": "board-grid", "index": MATCH}, "getRowsResponse"),
+    Input({"type": "board-grid", "index": MATCH}, "getRowsRequest"),
+    State('current-snapshot-data', 'data'),
+    prevent_initial_call=True
+)
+def serve_board_rows(request, data):
+    if not request:
+        return dash.no_update
+    key = ctx.triggered_id["index"]
+    with _BOARD_ROWS_LOCK:
+        df = _BOARD_ROWS.get(key)
+    if df is None:
+        # Evicted: rebuild from the snapshot on screen; a stale grid waits for its re-render
+        exp = key.split('|', 2)[2]
+        df_snap = _select_to_pandas(_table_from_store(data), _BOARD_READ_COLS) if data else None
+        if df_snap is None or df_snap.empty:
+            return dash.no_update
+        if _board_key(df_snap, exp) != key:
+            return dash.no_update
+        df = _register_board_rows(key, df_snap[df_snap['expiration_str'] == exp])
+    
+    for col, f in (request.get("filterModel") or {}).items():
+        op = _NUMBER_FILTERS.get(f.get("type"))
+        if op is not None and col in df.columns and f.get("filter") is not None:
+            df = df[op(df[col], f)]
+    sort_model = request.get("sortModel") or []
+    if sort_model:
+        df = df.sort_values([m["colId"] for m in sort_model], ascending=[m["sort"] == "asc" for m in sort_model])
+    
+    start, end = request.get("startRow", 0), request.get("endRow", 100)
+    return {"rowData": _records(_format_board_page(df.iloc[start:end])), "rowCount": len(df)}
+
+def render_board_tab(tbl_filtered, selected_expiries, active_expiry=None):
     if not selected_expiries or len(selected_expiries) == 0:
         return html.Div("Select expirations to view the board.")
-        
-    def parse_date(x):
-        try: return datetime.strptime(x, '%d%b%y')
-        except: return datetime.min
-        
-    sorted_expiries = sorted(selected_expiries, key=parse_date)
+    df_filtered = _select_to_pandas(tbl_filtered, _BOARD_READ_COLS)
+    
+    sorted_expiries = _sort_expiries(selected_expiries)
     
     tabs = []
     for exp in sorted_expiries:
         df_exp = df_filtered[df_filtered['expiration_str'] == exp]
-        
-        calls = df_exp[df_exp['type'] == 'call'].set_index('strike_price')
-        puts = df_exp[df_exp['type'] == 'put'].set_index('strike_price')
-        
-        combined = pd.merge(calls, puts, left_index=True, right_index=True, suffixes=('_c', '_p'), how='outer').reset_index()
-        combined.fillna(0, inplace=True)
-        
-        # Calculate ATM strike
-        underlying = df_exp['underlying_price'].iloc[0] if not df_exp.empty else 0
-        atm_strike = combined.iloc[(combined['strike_price'] - underlying).abs().argsort()[:1]]['strike_price'].values[0] if not combined.empty else 0
+        key = _board_key(df_filtered, exp)
+        _register_board_rows(key, df_exp)
         
         # EXPANDED COLUMNS (ENGLISH NAMES + MORE WIDTH)
         cols = [
             # Call side
-            {'field': 'theta_c', 'headerName': 'Theta', 'width': 100, 'valueFormatter': {"function": "d3.format(',.2f')(params.value)"}},
-            {'field': 'vega_c', 'headerName': 'Vega', 'width': 100, 'valueFormatter': {"function": "d3.format(',.2f')(params.value)"}},
-            {'field': 'gamma_c', 'headerName': 'Gamma', 'width': 100, 'valueFormatter': {"function": "d3.format(',.6f')(params.value)"}},
-            {'field': 'delta_c', 'headerName': 'Delta', 'width': 100, 'valueFormatter': {"function": "d3.format(',.2f')(params.value)"}, 'cellStyle': {'color': CUSTOM_CSS['accent_call'], 'fontWeight': 'bold'}},
-            {'field': 'bid_iv_c', 'headerName': 'IV Bid', 'width': 100, 'valueFormatter': {"function": "d3.format(',.1f')(params.value)"}},
+            {'field': 'theta_c', 'headerName': 'Theta', 'width': 100},
+            {'field': 'vega_c', 'headerName': 'Vega', 'width': 100},
+            {'field': 'gamma_c', 'headerName': 'Gamma', 'width': 100},
+            {'field': 'delta_c', 'headerName': 'Delta', 'width': 100, 'cellStyle': {'color': CUSTOM_CSS['accent_call'], 'fontWeight': 'bold'}},
+            {'field': 'bid_iv_c', 'headerName': 'IV Bid', 'width': 100},
             {'field': 'bid_price_c', 'headerName': 'Bid Call', 'width': 120, 'cellStyle': {'fontWeight': 'bold'}},
             {'field': 'ask_price_c', 'headerName': 'Ask Call', 'width': 120},
             
@@ -799,24 +1161,26 @@ def render_board_tab(df_filtered, selected_expiries, active_expiry=None):
             # Put side
             {'field': 'bid_price_p', 'headerName': 'Bid Put', 'width': 120, 'cellStyle': {'fontWeight': 'bold'}},
             {'field': 'ask_price_p', 'headerName': 'Ask Put', 'width': 120},
-            {'field': 'bid_iv_p', 'headerName': 'IV Bid', 'width': 100, 'valueFormatter': {"function": "d3.format(',.1f')(params.value)"}},
-            {'field': 'delta_p', 'headerName': 'Delta', 'width': 100, 'valueFormatter': {"function": "d3.format(',.2f')(params.value)"}, 'cellStyle': {'color': CUSTOM_CSS['accent_put'], 'fontWeight': 'bold'}},
-            {'field': 'gamma_p', 'headerName': 'Gamma', 'width': 100, 'valueFormatter': {"function": "d3.format(',.6f')(params.value)"}},
-            {'field': 'vega_p', 'headerName': 'Vega', 'width': 100, 'valueFormatter': {"function": "d3.format(',.2f')(params.value)"}},
-            {'field': 'theta_p', 'headerName': 'Theta', 'width': 100, 'valueFormatter': {"function": "d3.format(',.2f')(params.value)"}},
+            {'field': 'bid_iv_p', 'headerName': 'IV Bid', 'width': 100},
+            {'field': 'delta_p', 'headerName': 'Delta', 'width': 100, 'cellStyle': {'color': CUSTOM_CSS['accent_put'], 'fontWeight': 'bold'}},
+            {'field': 'gamma_p', 'headerName': 'Gamma', 'width': 100},
+            {'field': 'vega_p', 'headerName': 'Vega', 'width': 100},
+            {'field': 'theta_p', 'headerName': 'Theta', 'width': 100},
+            {'field': 'is_atm', 'hide': True},
         ]
         
         grid = dag.AgGrid(
-            id=f"grid-{exp}",
-            rowData=combined.to_dict("records"),
+            id={"type": "board-grid", "index": key},
+            rowModelType="infinite", # Rows are paged in by serve_board_rows
             columnDefs=cols,
-            defaultColDef={"sortable": True, "filter": True, "resizable": True},
+            defaultColDef={"sortable": True, "filter": "agNumberColumnFilter", "resizable": True},
             dashGridOptions={
                 "rowHeight": 35,
+                "cacheBlockSize": 50,
                 "getRowStyle": {
                     "styleConditions": [
                         {
-                            "condition": f"params.data.strike_price == {atm_strike}",
+                            "condition": "params.data && params.data.is_atm === 1",
                             "style": {"backgroundColor": "#FEF9E7"} # Очень бледный желтый для ATM
                         }
                     ]
@@ -852,24 +1216,27 @@ def store_active_board_expiry(val):
 
 # ... (render_3d_tab and main remain same)
 
-def render_3d_tab(df_snap):
+def render_3d_tab(tbl_snap):
+    df_snap = _select_to_pandas(tbl_snap, ['snapshot_time', 'expiration_str', 'strike_price', 'mark_iv'])
     # Fix expiry calculation using expiration_str
-    current_time = pd.to_datetime(df_snap['snapshot_time'].iloc[0])
-    # Map str back to date
-    df_snap['exp_dt'] = pd.to_datetime(df_snap['expiration_str'], format='%d%b%y')
-    df_snap['days_to_expiry'] = (df_snap['exp_dt'] - current_time).dt.days
+    current_time = pd.Timestamp(int(df_snap['snapshot_time'].iloc[0]), unit='ns')
+    # Map str back to date: parse each unique expiry once, broadcast by code
+    codes, uniques = pd.factorize(df_snap['expiration_str'])
+    exp_days = (pd.to_datetime(np.asarray(uniques, dtype=object), format='%d%b%y') - current_time).days
+    days_to_expiry = exp_days.to_numpy(dtype=np.int32)[codes]
     
-    fig_3d = go.Figure(data=[go.Scatter3d(
-        x=df_snap['strike_price'],
-        y=df_snap['days_to_expiry'],
-        z=df_snap['mark_iv'],
-        mode='markers',
-        marker=dict(
-            size=3,
-            color=df_snap['mark_iv'],
-            colorscale='Viridis',
-            opacity=0.8
-        )
+    # Mean IV on a (days_to_expiry x strike bucket) grid instead of one marker per contract
+    strike_centers, dte_values, z = bin_iv_surface(
+        df_snap['strike_price'].to_numpy(dtype=np.float64),
+        days_to_expiry,
+        df_snap['mark_iv'].to_numpy(dtype=np.float64)
+    )
+
+    fig_3d = go.Figure(data=[go.Surface(
+        x=strike_centers,
+        y=dte_values,
+        z=z,
+        colorscale='Viridis'
     )])
     
     fig_3d.update_layout(
@@ -901,7 +1268,7 @@ def render_3d_tab(df_snap):
     prevent_initial_call=True
 )
 def manage_harvest(start_clicks, stop_clicks, start_disabled, api_key):
-    global IS_PROCESSING, SHOULD_STOP, PROCESS_LOG_BUFFER
+    global IS_PROCESSING, SHOULD_STOP
     
     ctx = dash.callback_context
     if not ctx.triggered:
@@ -911,12 +1278,13 @@ def manage_harvest(start_clicks, stop_clicks, start_disabled, api_key):
     
     # Load current metrics
     harvester = DataHarvester()
-    days_count = len(harvester.state["processed_days"])
+    days_count = len(harvester.processed_days)
     space_saved = f"{harvester.space_saved_bytes / 1e9:.2f} GB"
 
     if trigger_id == "btn-start-harvest" and not IS_PROCESSING:
         SHOULD_STOP = False
-        PROCESS_LOG_BUFFER = ["--- Init Harvesting Pipeline ---\n"]
+        PROCESS_LOG_BUFFER.clear()
+        PROCESS_LOG_BUFFER.appendleft("--- Init Harvesting Pipeline ---\n")
         if not api_key:
             background_logger("ℹ️ No API Key: Running in FREE MODE (1st of each month only).")
         IS_PROCESSING = True
@@ -924,72 +1292,75 @@ def manage_harvest(start_clicks, stop_clicks, start_disabled, api_key):
         def run_harvest():
             global IS_PROCESSING, SHOULD_STOP
             try:
-                h = DataHarvester(logger=background_logger)
+                h = DataHarvester(logger=background_logger, api_key=api_key)
                 h.repair_staging(demo_mode=(not api_key))
                 target_dates = h.get_date_range()
+                
+                def get_stop(): return SHOULD_STOP
+                
+                targets = collections.deque()
                 for date_str in target_dates:
-                    if SHOULD_STOP:
-                        break
-                    
                     # Logic: Only 1st of month if no API key
                     if not api_key and not date_str.endswith("-01"):
                         continue
 
-                    if date_str in h.state["processed_days"]: 
+                    if date_str in h.processed_days: 
                         background_logger(f"⏭ Skipping {date_str} (Processed)")
                         continue
                     
-                    year_month = date_str[:7]
-                    url = f"https://datasets.tardis.dev/v1/deribit/options_chain/{date_str.replace('-','/')}/OPTIONS.csv.gz"
-                    save_name = f"TARDIS_Snap_{date_str}.csv.gz"
-                    
-                    def get_stop(): return SHOULD_STOP
-                    
-                    # Retry logic (up to 10 attempts with heavy exponential backoff)
-                    success = False
-                    for attempt in range(10):
-                        if SHOULD_STOP: break
-                        if attempt > 0:
-                            wait_time = 30 * (2 ** (attempt - 1)) # 30s, 60s, 120s, 240s...
-                            background_logger(f"🔄 Retry attempt {attempt+1}/10 for {date_str} (waiting {wait_time}s)...")
-                            for _ in range(wait_time): # Interruption-friendly sleep
-                                if SHOULD_STOP: break
-                                time.sleep(1)
-                            if SHOULD_STOP: break
-
-                        if download_file(url, save_name, logger=background_logger, stop_signal=get_stop, context_date=date_str, api_key=api_key):
-                            
-                            # Gap detection and market state reset BEFORE processing
-                            last_done = h.state["processed_days"][-1] if h.state["processed_days"] else None
-                            if last_done:
-                                d1 = datetime.strptime(last_done, "%Y-%m-%d")
-                                d2 = datetime.strptime(date_str, "%Y-%m-%d")
-                                if (d2 - d1).days > 2:
-                                    background_logger(f"🔄 Large gap detected ({ (d2-d1).days } days). Resetting market state for fresh start.")
-                                    h.market_state = {"BTC": {}, "ETH": {}}
-
-                            h.process_daily_file(save_name, date_str, stop_signal=get_stop)
-                            gz_path = os.path.join("archives_all_years", save_name)
-                            if os.path.exists(gz_path):
-                                sz = os.path.getsize(gz_path)
-                                os.remove(gz_path)
-                                h.space_saved_bytes += sz
-                            h.state["processed_days"].append(date_str)
-                            h.state["space_saved"] = h.space_saved_bytes
-                            h.save_state()
-                            h.save_market_state()
-                            h.check_and_consolidate(year_month, demo_mode=(not api_key))
-                            success = True
+                    targets.append(date_str)
+                
+                # Downloads overlap on the harvester's pool size and session (same retry policy
+                # as DataHarvester.run); processing stays on this thread and in date order,
+                # since market_state carries over from one day to the next.
+                in_flight = collections.deque()
+                with concurrent.futures.ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+                    while targets or in_flight:
+                        while targets and len(in_flight) < DOWNLOAD_WORKERS and not SHOULD_STOP:
+                            date_str = targets.popleft()
+                            in_flight.append((date_str, pool.submit(h._fetch_day, date_str, get_stop)))
+                        if SHOULD_STOP or not in_flight:
                             break
-                    
-                    if not success and not SHOULD_STOP:
-                        background_logger(f"❌ Failed to download {date_str} after 3 attempts. Moving to next.")
+                        
+                        date_str, future = in_flight.popleft()
+                        h.progress_date = date_str # Status bar follows the day being waited on
+                        save_name = future.result()
+                        if save_name is None:
+                            if not SHOULD_STOP:
+                                background_logger(f"❌ Failed to download {date_str} after {DOWNLOAD_ATTEMPTS} attempts. Moving to next.")
+                            continue
+                        
+                        year_month = date_str[:7]
+                        
+                        # Gap detection and market state reset BEFORE processing
+                        last_done = h.last_processed()
+                        if last_done:
+                            d1 = datetime.strptime(last_done, "%Y-%m-%d")
+                            d2 = datetime.strptime(date_str, "%Y-%m-%d")
+                            if (d2 - d1).days > 2:
+                                background_logger(f"🔄 Large gap detected ({ (d2-d1).days } days). Resetting market state for fresh start.")
+                                h.reset_market_state()
+
+                        h.process_daily_file(save_name, date_str, stop_signal=get_stop)
+                        gz_path = os.path.join("archives_all_years", save_name)
+                        if os.path.exists(gz_path):
+                            sz = os.path.getsize(gz_path)
+                            os.remove(gz_path)
+                            h.space_saved_bytes += sz
+                        h.mark_processed(date_str)
+                        h.state["space_saved"] = h.space_saved_bytes
+                        h.save_state()
+                        h.save_market_state()
+                        h.check_and_consolidate(year_month, demo_mode=(not api_key))
                 
                 background_logger("\n✅ Pipeline Finished or Paused.")
             except Exception as e:
                 background_logger(f"\n❌ CRITICAL ERROR: {e}")
             finally:
                 IS_PROCESSING = False
+                # New parquets may have landed - drop stale monthly frames and listings
+                _load_cached.cache_clear()
+                invalidate_metadata_cache()
 
         thread = threading.Thread(target=run_harvest)
         thread.daemon = True
@@ -1010,29 +1381,37 @@ def manage_harvest(start_clicks, stop_clicks, start_disabled, api_key):
      Output("status-progress-bar", "label"),
      Output("status-speed", "children"),
      Output("status-file", "children"),
-     Output("status-download-info", "children")],
+     Output("status-download-info", "children"),
+     Output("metadata-sig-store", "data")],
     [Input("loader-interval", "n_intervals")],
+    [State("metadata-sig-store", "data")],
     prevent_initial_call=True
 )
-def update_loader_log(n):
-    global PROCESS_LOG_BUFFER, IS_PROCESSING, STATUS_DATA
-    log_text = "".join(list(reversed(PROCESS_LOG_BUFFER)))
+def update_loader_log(n, known_sig):
+    # deque -> list copy happens in C, so the harvester thread cannot interleave
+    log_text = "".join(list(PROCESS_LOG_BUFFER)) # already newest-first, no reverse
+    status = STATUS_DATA # one consistent dict for the whole render
     
-    # Also refresh metadata periodically so new months appear in Analyzer
-    metadata = get_processed_metadata() if n % 10 == 0 else dash.no_update
+    # Push metadata only when the data dirs changed since this client's last copy (two stats per tick)
+    sig = list(_dir_signature(PROCESSED_DIR, STAGING_DIR))
+    if sig != known_sig:
+        metadata = get_processed_metadata()
+    else:
+        metadata = sig = dash.no_update
     
-    download_info = f"{STATUS_DATA['downloaded']} / {STATUS_DATA['total']} MB"
+    download_info = f"{status['downloaded']} / {status['total']} MB"
     
     return (
         log_text, 
         metadata,
-        STATUS_DATA["stage"],
-        STATUS_DATA["date"],
-        STATUS_DATA["progress"],
-        f"{STATUS_DATA['progress']:.1f}%" if STATUS_DATA["progress"] > 0 else "",
-        STATUS_DATA["speed"],
-        STATUS_DATA["file"],
-        download_info
+        status["stage"],
+        status["date"],
+        status["progress"],
+        f"{status['progress']:.1f}%" if status["progress"] > 0 else "",
+        status["speed"],
+        status["file"],
+        download_info,
+        sig
     )
 
 
@@ -1,5 +1,9 @@
 import gzip
+import shutil
+import struct
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import calendar
 import time
@@ -8,6 +12,11 @@ from datetime import datetime, timedelta
 ARCHIVE_DIR = os.path.join(os.getcwd(), "archives_all_years")
 os.makedirs(ARCHIVE_DIR, exist_ok=True)
 
+# Shared keep-alive session: one TLS handshake per pooled connection instead of per file.
+# Retries stay off - download_file already resumes via Range on the next attempt.
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=0, backoff_factor=0)))
+
 def get_last_friday(year, month):
     # The last day of the month
     last_day = calendar.monthrange(year, month)[1]
@@ -44,7 +53,70 @@ def generate_tardis_sample_links():
             links.append((date_str, url))
     return links
 
-def download_file(url, save_name, logger=None, stop_signal=None, context_date="-", api_key=None):
+def read_gzip_trailer(path):
+    """O(1) structural check of a .gz: returns the trailer (crc32, isize) or None.
+
+    Only the magic bytes and the presence of 8 trailing bytes are checked, so a
+    truncated file can still pass; gzip_is_complete() adds the size check.
+    """
+    with open(path, 'rb') as f:
+        if f.read(2) != b'\x1f\x8b':
+            return None
+        f.seek(0, 2)
+        if f.tell() < 18: # 10-byte header + 8-byte trailer
+            return None
+        f.seek(-8, 2)
+        return struct.unpack('<II', f.read(8))
+
+def gzip_is_complete(path, expected_size=0):
+    """True if the .gz at path is a whole archive.
+
+    With a known expected_size (content-length) the O(1) trailer check plus a
+    byte-count comparison is enough; without it the archive is fully inflated,
+    which verifies every member's CRC32 and ISIZE and raises on truncation.
+    """
+    if read_gzip_trailer(path) is None:
+        return False
+    if expected_size:
+        return os.path.getsize(path) == expected_size
+    try:
+        with gzip.open(path, 'rb') as f:
+            while f.read(16 * 1024 * 1024):
+                pass
+    except (OSError, EOFError, ValueError):
+        return False
+    return True
+
+class _ProgressWriter:
+    """File wrapper that counts written bytes and reports throughput every 0.5 s."""
+
+    def __init__(self, f, existing_size, report, stop_signal=None, log=print):
+        self.f = f
+        self.existing_size = existing_size
+        self.report = report
+        self.stop_signal = stop_signal
+        self.log = log
+        self.accumulated = 0
+        self.last_accumulated = 0
+        self.last_log_time = time.monotonic()
+
+    def write(self, chunk):
+        if self.stop_signal and self.stop_signal():
+            self.log("  🛑 Download interrupted by user.")
+            raise InterruptedError("Stopped")
+        
+        n = self.f.write(chunk)
+        self.accumulated += len(chunk)
+        
+        now = time.monotonic()
+        if now - self.last_log_time >= 0.5:
+            speed = (self.accumulated - self.last_accumulated) / (now - self.last_log_time) / (1024*1024)
+            self.report(self.existing_size + self.accumulated, speed)
+            self.last_log_time = now
+            self.last_accumulated = self.accumulated
+        return n
+
+def download_file(url, save_name, logger=None, stop_signal=None, context_date="-", api_key=None, session=None):
     path = os.path.join(ARCHIVE_DIR, save_name)
     
     def log(msg):
@@ -65,92 +137,83 @@ def download_file(url, save_name, logger=None, stop_signal=None, context_date="-
         headers['Authorization'] = f"Bearer {api_key}"
 
     try:
-        r = requests.get(url, headers=headers, stream=True, timeout=60)
-        
-        if r.status_code == 403:
-            log(f"  ⚠️ Access Forbidden (403) for {save_name}. Possible rate limit or block.")
-            return False
+        # Context manager returns the pooled connection on every early return too
+        with (session or _SESSION).get(url, headers=headers, stream=True, timeout=60) as r:
+            if r.status_code in (429, 503):
+                # Throttled: honour Retry-After (capped) so the caller's next attempt is not wasted
+                retry_after = r.headers.get('Retry-After', '')
+                wait_s = min(int(retry_after), 60) if retry_after.isdigit() else 0
+                log(f"  ⚠️ Server busy ({r.status_code}) for {save_name}. Waiting {wait_s}s before retry.")
+                time.sleep(wait_s)
+                return False
+
+            if r.status_code == 403:
+                log(f"  ⚠️ Access Forbidden (403) for {save_name}. Possible rate limit or block.")
+                return False
         
-        # Total size for progress calculation
-        total_size = int(r.headers.get('content-length', 0)) + existing_size
+            # Total size for progress calculation
+            total_size = int(r.headers.get('content-length', 0)) + existing_size
         
-        # If server returns 416 (Requested Range Not Satisfiable), file is complete
-        if r.status_code == 416:
-            log(f"PROGRESS:{context_date}|Finalizing|100|0.0 MB/s|{save_name}")
-            log(f"  ✅ {save_name} is already complete.")
-            return True
+            # If server returns 416 (Requested Range Not Satisfiable), file is complete
+            if r.status_code == 416:
+                log(f"PROGRESS:{context_date}|Finalizing|100|0.0 MB/s|{save_name}")
+                log(f"  ✅ {save_name} is already complete.")
+                return True
             
-        if r.status_code not in [200, 206]:
-            log(f"  ❌ Server returned {r.status_code} for {save_name}")
-            return False
+            if r.status_code not in [200, 206]:
+                log(f"  ❌ Server returned {r.status_code} for {save_name}")
+                return False
 
-        mode = 'wb'
-        if r.status_code == 200 and existing_size > 0:
-            # Maybe it's already full? Check integrity before wiping.
-            try:
-                with gzip.open(path, 'rb') as f_test:
-                    f_test.seek(-1, 2)
-                    f_test.read(1)
-                log(f"PROGRESS:{context_date}|Existing|100|0.0 MB/s|{save_name}")
-                log(f"  ✨ Local file {save_name} is already complete. Skipping download.")
-                return True
-            except:
-                log(f"  ⚠️ Server doesn't support resume, restarting {save_name}...")
-                existing_size = 0
-        elif r.status_code == 206:
-            mode = 'ab'
-
-        accumulated = 0
-        last_log_time = time.time()
-        last_accumulated = 0
-
-        with open(path, mode) as f:
-            for chunk in r.iter_content(chunk_size=1024*1024): # 1MB chunks
-                if chunk:
-                    if stop_signal and stop_signal():
-                        log("  🛑 Download interrupted by user.")
-                        raise InterruptedError("Stopped")
-                        
-                    f.write(chunk)
-                    accumulated += len(chunk)
-                    
-                    now = time.time()
-                    if now - last_log_time >= 0.5:
-                        speed = (accumulated - last_accumulated) / (now - last_log_time) / (1024*1024)
-                        current_total = existing_size + accumulated
-                        
-                        # Accurate percentage if total_size is known, else heuristic
-                        if total_size > 0:
-                            pct = min(100, (current_total / total_size) * 100)
-                            total_final_mb = total_size / (1024*1024)
-                        else:
-                            pct = min(99, (current_total / 1_500_000_000) * 100)
-                            total_final_mb = 0
-                        
-                        curr_mb = current_total / (1024*1024)
-                        log(f"PROGRESS:{context_date}|Downloading|{pct:.1f}|{speed:.2f} MB/s|{save_name}|{curr_mb:.1f}|{total_final_mb:.1f}")
-                        
-                        last_log_time = now
-                        last_accumulated = accumulated
+            mode = 'wb'
+            if r.status_code == 200 and existing_size > 0:
+                # Maybe it's already full? Check integrity before wiping.
+                try:
+                    remote_size = int(r.headers.get('content-length', 0))
+                    if not gzip_is_complete(path, remote_size):
+                        raise ValueError("incomplete local file")
+                    log(f"PROGRESS:{context_date}|Existing|100|0.0 MB/s|{save_name}")
+                    log(f"  ✨ Local file {save_name} is already complete. Skipping download.")
+                    return True
+                except (OSError, ValueError):
+                    log(f"  ⚠️ Server doesn't support resume, restarting {save_name}...")
+                    existing_size = 0
+            elif r.status_code == 206:
+                mode = 'ab'
+
+            def report(current_total, speed):
+                # Accurate percentage if total_size is known, else heuristic
+                if total_size > 0:
+                    pct = min(100, (current_total / total_size) * 100)
+                    total_final_mb = total_size / (1024*1024)
+                else:
+                    pct = min(99, (current_total / 1_500_000_000) * 100)
+                    total_final_mb = 0
+            
+                curr_mb = current_total / (1024*1024)
+                log(f"PROGRESS:{context_date}|Downloading|{pct:.1f}|{speed:.2f} MB/s|{save_name}|{curr_mb:.1f}|{total_final_mb:.1f}")
+
+            # copyfileobj keeps the read/write loop in C; progress rides on write()
+            r.raw.decode_content = True
+            with open(path, mode) as f:
+                shutil.copyfileobj(r.raw, _ProgressWriter(f, existing_size, report, stop_signal, log), length=4*1024*1024)
         
-        # Double check: if we have total_size, did we actually reach it?
-        final_size = os.path.getsize(path)
-        if total_size > 0 and final_size < total_size:
-            log(f"  ⚠️ Connection closed prematurely ({final_size}/{total_size} bytes).")
-            return False
+            # Double check: if we have total_size, did we actually reach it?
+            final_size = os.path.getsize(path)
+            if total_size > 0 and final_size < total_size:
+                log(f"  ⚠️ Connection closed prematurely ({final_size}/{total_size} bytes).")
+                return False
             
-        # Final safety check: try to read the last byte of GZ to ensure it's not truncated
-        try:
-            with gzip.open(path, 'rb') as f:
-                f.seek(-1, 2)
-                f.read(1)
-        except Exception as e:
-            log(f"  ❌ GZIP Integrity Check Failed: File is likely truncated or corrupted. ({str(e)})")
-            return False
+            # Final safety check: header/trailer, plus a full inflate when the size was unknown
+            try:
+                if not gzip_is_complete(path, total_size):
+                    raise ValueError("bad or truncated gzip")
+            except Exception as e:
+                log(f"  ❌ GZIP Integrity Check Failed: File is likely truncated or corrupted. ({str(e)})")
+                return False
         
-        log(f"PROGRESS:{context_date}|Finalizing|100|0.0 MB/s|{save_name}")
-        log(f"  ✅ Finished: {save_name} (Total: {final_size/1e6:.1f} MB)")
-        return True
+            log(f"PROGRESS:{context_date}|Finalizing|100|0.0 MB/s|{save_name}")
+            log(f"  ✅ Finished: {save_name} (Total: {final_size/1e6:.1f} MB)")
+            return True
     except Exception as e:
         log(f"  ⚠️ Error downloading {save_name}: {str(e)}")
         return False
@@ -1,24 +1,245 @@
 import os
 import json
 import time
+import collections
+import concurrent.futures
+import contextlib
+import heapq
+import struct
+import threading
+import numpy as np
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+try:
+    import rapidgzip # Optional: parallel inflate across cores
+    HAS_RAPIDGZIP = True
+except ImportError:
+    HAS_RAPIDGZIP = False
+try:
+    from isal import igzip as _gzip # Optional: ISA-L accelerated inflate
+except ImportError:
+    import gzip as _gzip
 from datetime import datetime, timedelta
 from expand_timeline import download_file
+from preprocess_hourly import add_derived_columns
 
 STATE_FILE = "harvest_state.json"
-MARKET_STATE_PKL = "market_state.pkl"
+STATE_WAL = "harvest_state.wal" # Appended per save, folded into STATE_FILE every WAL_COMPACT_EVERY records
+WAL_RECORD = struct.Struct('<IQI') # day_index, space_saved, reserved
+WAL_NO_DAY = 0xFFFFFFFF
+WAL_COMPACT_EVERY = 30
+MARKET_STATE_PKL = "market_state.pkl" # Legacy format, only read to migrate
+MARKET_STATE_FILES = {"BTC": "BTC_state.arrow", "ETH": "ETH_state.arrow"}
 STAGING_DIR = "staging"
 PROCESSED_DIR = "processed_snapshots"
 
+DOWNLOAD_WORKERS = 4 # Daily archives downloaded ahead of processing
+PARSE_PROGRESS_FMT = "PROGRESS:{date}|Parsing CSV|{pct:.1f}|{krps:.1f}k r/s|{name}|{done_mb:.1f}|{total_mb:.1f}"
+DOWNLOAD_ATTEMPTS = 3 # Range-resumes after a dropped stream; HTTP errors back off inside urllib3
+
+# Parse dtypes for the Tardis OPTIONS columns we keep (lower-case names)
+CSV_DTYPES = {
+    'strike_price': 'float32', 'open_interest': 'float32', 'last_price': 'float32',
+    'bid_price': 'float32', 'ask_price': 'float32', 'mark_price': 'float32',
+    'underlying_price': 'float32', 'bid_iv': 'float32', 'ask_iv': 'float32', 'mark_iv': 'float32',
+    'delta': 'float32', 'gamma': 'float32', 'vega': 'float32', 'theta': 'float32', 'rho': 'float32',
+    'timestamp': 'int64', 'expiration': 'int64', 'symbol': 'category', 'type': 'category',
+}
+# State rows come back as Python floats/str; snapshots are re-narrowed to the parse dtypes
+SNAPSHOT_DTYPES = {c: t for c, t in CSV_DTYPES.items() if c != 'timestamp'}
+
+def _open_gzip(raw):
+    """Decompressing reader over an open .gz file: rapidgzip (parallel) > isal > stdlib gzip."""
+    if HAS_RAPIDGZIP:
+        return rapidgzip.open(raw, parallelization=min(8, os.cpu_count() or 1))
+    return _gzip.open(raw, 'rb')
+
+def _read_csv_chunks(gz_path, usecols, dtypes):
+    """Yields (DataFrame chunk, compressed bytes consumed so far) from a Tardis .csv.gz.
+
+    Rows with a null int64 column (timestamp / expiration) are dropped before
+    conversion: pandas would turn the column into float NaN, which neither the
+    hour bucketing nor CoinState's int64 slots can hold.
+    """
+    arrow_types = {'float32': pa.float32(), 'int64': pa.int64(), 'category': pa.dictionary(pa.int32(), pa.string())}
+    int_cols = [c for c, t in dtypes.items() if t == 'int64']
+    with open(gz_path, 'rb') as raw, _open_gzip(raw) as gz_stream:
+        # Arrow parses the already-inflated stream, so rapidgzip/isal still do the decompression
+        reader = pacsv.open_csv(
+            pa.PythonFile(gz_stream, mode='r'),
+            read_options=pacsv.ReadOptions(block_size=64 << 20, use_threads=True),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=usecols,
+                column_types={c: arrow_types[t] for c, t in dtypes.items()},
+            ),
+        )
+        for batch in reader:
+            if any(batch.column(c).null_count for c in int_cols):
+                valid = pc.is_valid(batch.column(int_cols[0]))
+                for c in int_cols[1:]:
+                    valid = pc.and_(valid, pc.is_valid(batch.column(c)))
+                batch = batch.filter(valid)
+            yield batch.to_pandas(split_blocks=True), raw.tell()
+
+def _consolidate_days(daily_files, out_path):
+    """Streams daily staging files into one monthly parquet, one row group per day.
+
+    Only one day is in memory at a time (no month-wide pd.concat); the result is
+    written next to out_path and renamed into place once complete.
+    """
+    tmp_path = out_path + ".tmp"
+    writer = None
+    try:
+        for f in daily_files:
+            # Re-derive: per-day categoricals don't share categories across days
+            tbl = pa.Table.from_pandas(add_derived_columns(pd.read_parquet(f)), preserve_index=False)
+            if writer is None:
+                # Widen dictionary indices so every day's categories fit the same schema
+                schema = pa.schema([
+                    pa.field(fld.name, pa.dictionary(pa.int32(), fld.type.value_type))
+                    if pa.types.is_dictionary(fld.type) else fld
+                    for fld in tbl.schema
+                ], metadata=tbl.schema.metadata)
+                writer = pq.ParquetWriter(tmp_path, schema, compression='snappy', use_dictionary=True)
+            writer.write_table(tbl.select(schema.names).cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, out_path)
+
+# processed_days persist as a bitset: bit i <=> PROCESSED_EPOCH + i days (the harvest start date)
+PROCESSED_EPOCH = datetime(2021, 1, 1)
+
+def _day_index(day):
+    return (datetime.strptime(day, "%Y-%m-%d") - PROCESSED_EPOCH).days
+
+def _day_from_index(i):
+    return (PROCESSED_EPOCH + timedelta(days=i)).strftime("%Y-%m-%d")
+
+def _days_to_bits(days):
+    idx = [i for i in map(_day_index, days) if i >= 0]
+    bits = bytearray(max(idx) // 8 + 1 if idx else 0)
+    for i in idx:
+        bits[i >> 3] |= 1 << (i & 7)
+    return bits.hex()
+
+def _bits_to_days(hex_bits):
+    days = set()
+    for byte_i, byte in enumerate(bytes.fromhex(hex_bits)):
+        for bit in range(8):
+            if byte >> bit & 1:
+                days.add(_day_from_index(byte_i * 8 + bit))
+    return days
+
 import pickle
 
+class CoinState:
+    """
+    Columnar (struct-of-arrays) market state for one coin.
+
+    Each live symbol owns a slot in per-column NumPy arrays; updates overwrite
+    slots in place and an hourly snapshot is a fancy-index copy per column
+    instead of a DataFrame rebuilt from per-symbol dicts. Expired symbols are
+    found through a min-heap of (expiration_us, symbol) and their slots reused.
+    """
+    COLUMNS = {c: (object if t == 'category' else t) for c, t in SNAPSHOT_DTYPES.items()}
+
+    def __init__(self, capacity=65536):
+        self.symbols = {}  # symbol -> slot
+        self.free_list = []
+        self.expiry_heap = []
+        self.size = 0  # High-water mark of used slots
+        self.live = np.zeros(capacity, dtype=bool)
+        self.columns = {c: self._blank(t, capacity) for c, t in self.COLUMNS.items()}
+
+    @staticmethod
+    def _blank(dtype, n):
+        if dtype is object:
+            return np.full(n, None, dtype=object)
+        if np.issubdtype(np.dtype(dtype), np.floating):
+            return np.full(n, np.nan, dtype=dtype)
+        return np.zeros(n, dtype=dtype)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _alloc(self):
+        if self.free_list:
+            return self.free_list.pop()
+        if self.size == len(self.live):
+            grow = len(self.live)
+            self.live = np.concatenate([self.live, np.zeros(grow, dtype=bool)])
+            for c, arr in self.columns.items():
+                self.columns[c] = np.concatenate([arr, self._blank(self.COLUMNS[c], grow)])
+        self.size += 1
+        return self.size - 1
+
+    def update(self, rows):
+        """Upserts the latest row per symbol (rows must be unique by symbol)."""
+        syms = rows['symbol'].astype(str).tolist()
+        exps = rows['expiration'].to_numpy()
+        slots = np.empty(len(syms), dtype=np.int64)
+        for i, sym in enumerate(syms):
+            slot = self.symbols.get(sym)
+            if slot is None:
+                # Expiration never changes per symbol: only newcomers enter the heap
+                slot = self.symbols[sym] = self._alloc()
+                heapq.heappush(self.expiry_heap, (int(exps[i]), sym))
+            slots[i] = slot
+        for c, arr in self.columns.items():
+            if c == 'symbol':
+                arr[slots] = syms
+            elif c in rows.columns:
+                arr[slots] = rows[c].to_numpy()
+        self.live[slots] = True
+
+    def prune(self, ts_us):
+        """Frees every symbol that expired before ts_us."""
+        heap = self.expiry_heap
+        while heap and heap[0][0] < ts_us:
+            exp, sym = heapq.heappop(heap)
+            slot = self.symbols.get(sym)
+            if slot is not None and self.columns['expiration'][slot] == exp:
+                del self.symbols[sym]
+                self.live[slot] = False
+                self.free_list.append(slot)
+
+    def snapshot(self):
+        idxs = np.flatnonzero(self.live[:self.size])
+        df = pd.DataFrame({c: arr[idxs] for c, arr in self.columns.items()})
+        return df.astype({c: 'category' for c, t in SNAPSHOT_DTYPES.items() if t == 'category'})
+
+    @classmethod
+    def from_frame(cls, df):
+        state = cls(capacity=max(65536, 2 * len(df)))
+        if len(df):
+            state.update(df.drop_duplicates('symbol', keep='last'))
+        return state
+
+
 class DataHarvester:
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, api_key=None):
         self.logger = logger
+        self.api_key = api_key
+        self.progress_date = None # Only this day's download progress is reported (head of the queue)
         self.state = self.load_state()
         self.market_state = self.load_market_state()
         self.space_saved_bytes = self.state.get("space_saved", 0)
         
+        # Pooled keep-alive session shared by the download workers; urllib3 retries
+        # throttling / 5xx with exponential backoff and honours Retry-After
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=DOWNLOAD_WORKERS, pool_maxsize=DOWNLOAD_WORKERS,
+            max_retries=Retry(total=3, backoff_factor=2, status_forcelist=[429, 500, 502, 503, 504],
+                              allowed_methods=["GET"], raise_on_status=False)))
+        
         # Ensure directories exist
         os.makedirs(STAGING_DIR, exist_ok=True)
         os.makedirs(PROCESSED_DIR, exist_ok=True)
@@ -29,24 +250,93 @@ class DataHarvester:
         else: print(msg)
 
     def load_state(self):
+        state = {"space_saved": 0}
         if os.path.exists(STATE_FILE):
             with open(STATE_FILE, 'r') as f:
-                return json.load(f)
-        return {"processed_days": [], "space_saved": 0}
+                state = json.load(f)
+        # Set for O(1) membership; older state files still carry the plain list
+        if "processed_bits" in state:
+            self.processed_days = _bits_to_days(state.pop("processed_bits"))
+        else:
+            self.processed_days = set(state.pop("processed_days", []))
+        
+        # Replay saves made since the last compaction (a torn trailing record is ignored)
+        self._pending_days = []
+        self._wal_records = 0
+        if os.path.exists(STATE_WAL):
+            with open(STATE_WAL, 'rb') as f:
+                data = f.read()
+            data = data[:len(data) - len(data) % WAL_RECORD.size]
+            for day_idx, space_saved, _ in WAL_RECORD.iter_unpack(data):
+                if day_idx != WAL_NO_DAY:
+                    self.processed_days.add(_day_from_index(day_idx))
+                state["space_saved"] = space_saved
+                self._wal_records += 1
+        return state
+
+    def mark_processed(self, date_str):
+        if date_str not in self.processed_days:
+            self.processed_days.add(date_str)
+            self._pending_days.append(date_str)
+
+    def last_processed(self):
+        return max(self.processed_days) if self.processed_days else None
 
     def load_market_state(self):
+        # One Feather file per coin, one row per symbol
+        if any(os.path.exists(p) for p in MARKET_STATE_FILES.values()):
+            return {
+                coin: CoinState.from_frame(pd.read_feather(path)) if os.path.exists(path) else CoinState()
+                for coin, path in MARKET_STATE_FILES.items()
+            }
         if os.path.exists(MARKET_STATE_PKL):
             with open(MARKET_STATE_PKL, 'rb') as f:
-                return pickle.load(f)
-        return {"BTC": {}, "ETH": {}}
+                legacy = pickle.load(f) # {coin: {symbol: row dict}}
+            return {coin: CoinState.from_frame(pd.DataFrame(list(legacy.get(coin, {}).values())))
+                    for coin in ("BTC", "ETH")}
+        return {"BTC": CoinState(), "ETH": CoinState()}
+
+    def reset_market_state(self):
+        self.market_state = {"BTC": CoinState(), "ETH": CoinState()}
+
+    def _state_to_df(self, coin):
+        return self.market_state[coin].snapshot()
 
     def save_market_state(self):
-        with open(MARKET_STATE_PKL, 'wb') as f:
-            pickle.dump(self.market_state, f)
+        for coin, path in MARKET_STATE_FILES.items():
+            if not self.market_state.get(coin):
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            # Write-then-rename so a crash never leaves a half-written state file
+            tmp_path = path + ".tmp"
+            self._state_to_df(coin).to_feather(tmp_path)
+            os.replace(tmp_path, path)
 
     def save_state(self):
-        with open(STATE_FILE, 'w') as f:
-            json.dump(self.state, f)
+        # Constant-size fsync'd append per newly processed day instead of rewriting the JSON
+        space_saved = int(self.state.get("space_saved", 0))
+        idxs = [i for i in map(_day_index, self._pending_days) if i >= 0] or [WAL_NO_DAY]
+        with open(STATE_WAL, 'ab') as f:
+            f.write(b"".join(WAL_RECORD.pack(i, space_saved, 0) for i in idxs))
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending_days = []
+        self._wal_records += len(idxs)
+        if self._wal_records >= WAL_COMPACT_EVERY:
+            self._compact_state()
+
+    def _compact_state(self):
+        """Folds the WAL into STATE_FILE (atomic rename), then empties the WAL."""
+        tmp_path = STATE_FILE + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({**self.state, "processed_bits": _days_to_bits(self.processed_days)}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, STATE_FILE)
+        # Replaying stale records after a crash here is harmless: they are idempotent
+        open(STATE_WAL, 'wb').close()
+        self._wal_records = 0
 
     def get_date_range(self, start_date_str="2021-01-01"):
         start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
@@ -59,61 +349,88 @@ class DataHarvester:
             curr += timedelta(days=1)
         return dates
 
+    def _fetch_day(self, date_str, stop_signal=None):
+        """Downloads one daily archive, resuming dropped streams; returns the save name or None."""
+        url = f"https://datasets.tardis.dev/v1/deribit/options_chain/{date_str.replace('-','/')}/OPTIONS.csv.gz"
+        save_name = f"TARDIS_Snap_{date_str}.csv.gz"
+        for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+            if stop_signal and stop_signal():
+                return None
+            if download_file(url, save_name, logger=self._download_logger(date_str), stop_signal=stop_signal,
+                             context_date=date_str, api_key=self.api_key, session=self.session):
+                return save_name
+            if attempt < DOWNLOAD_ATTEMPTS:
+                self.log(f"⚠️ {date_str}: resuming, attempt {attempt+1}/{DOWNLOAD_ATTEMPTS}...")
+        return None
+
+    def _download_logger(self, date_str):
+        """Log sink for one day's download: PROGRESS lines pass only while it is the awaited day."""
+        def log(msg):
+            if msg.startswith("PROGRESS:") and date_str != self.progress_date:
+                return
+            self.log(msg)
+        return log
+
     def run(self):
         target_dates = self.get_date_range()
         self.log(f"🚀 Starting Auto-Harvest. Target: {len(target_dates)} days.")
 
+        pending = collections.deque()
         for date_str in target_dates:
-            if date_str in self.state["processed_days"]:
+            if date_str in self.processed_days:
                 continue
             
             # 1. Check if month is already finalized
             year_month = date_str[:7] # YYYY-MM
             if os.path.exists(os.path.join(PROCESSED_DIR, f"BTC_{year_month}.parquet")):
-                 # If finalized file exists, mark all days of this month as done
-                 self.log(f"⏭ Month {year_month} already finalized. Skipping.")
-                 self.mark_month_done(year_month)
-                 continue
-
-            self.log(f"--- Processing Day: {date_str} ---")
-            
-            # 2. Download with Retry
-            url = f"https://datasets.tardis.dev/v1/deribit/options_chain/{date_str.replace('-','/')}/OPTIONS.csv.gz"
-            save_name = f"TARDIS_Snap_{date_str}.csv.gz"
-            
-            success = False
-            for attempt in range(3):
-                if download_file(url, save_name, logger=self.logger):
-                    success = True
-                    break
-                self.log(f"⚠️ Retry {attempt+1}/3 in 10s...")
-                time.sleep(10)
+                # If finalized file exists, mark all days of this month as done
+                self.log(f"⏭ Month {year_month} already finalized. Skipping.")
+                self.mark_month_done(year_month)
+                continue
+            pending.append(date_str)
 
-            if not success:
-                self.log(f"❌ Failed to download {date_str} after retries. Stopping.")
-                break
-            
-            # 3. Process (Daily)
+        # 2. Download ahead on a small pool while this thread processes days in order
+        # (market_state carries over, so processing itself stays sequential)
+        stop = threading.Event()
+        in_flight = collections.deque()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
             try:
-                gz_path = os.path.join("archives_all_years", save_name)
-                gz_size = os.path.getsize(gz_path)
-                
-                self.process_daily_file(save_name, date_str)
-                
-                # 4. Cleanup GZ & Track Savings
-                if os.path.exists(gz_path):
-                    os.remove(gz_path)
-                    self.space_saved_bytes += gz_size
-                    self.log(f"🗑 Deleted {save_name}. Total space saved: {self.space_saved_bytes/1e9:.2f} GB")
-                
-                self.state["processed_days"].append(date_str)
-                self.state["space_saved"] = self.space_saved_bytes
-                self.save_state()
-                self.save_market_state()
-                
-            except Exception as e:
-                self.log(f"💥 Error processing {date_str}: {e}")
-                break
+                while pending or in_flight:
+                    while pending and len(in_flight) < DOWNLOAD_WORKERS:
+                        date_str = pending.popleft()
+                        in_flight.append((date_str, pool.submit(self._fetch_day, date_str, stop.is_set)))
+
+                    date_str, future = in_flight.popleft()
+                    self.log(f"--- Processing Day: {date_str} ---")
+                    self.progress_date = date_str
+                    save_name = future.result()
+                    if save_name is None:
+                        self.log(f"❌ Failed to download {date_str} after retries. Stopping.")
+                        break
+                    
+                    # 3. Process (Daily)
+                    try:
+                        gz_path = os.path.join("archives_all_years", save_name)
+                        gz_size = os.path.getsize(gz_path)
+                        
+                        self.process_daily_file(save_name, date_str)
+                        
+                        # 4. Cleanup GZ & Track Savings
+                        if os.path.exists(gz_path):
+                            os.remove(gz_path)
+                            self.space_saved_bytes += gz_size
+                            self.log(f"🗑 Deleted {save_name}. Total space saved: {self.space_saved_bytes/1e9:.2f} GB")
+                        
+                        self.mark_processed(date_str)
+                        self.state["space_saved"] = self.space_saved_bytes
+                        self.save_state()
+                        self.save_market_state()
+                        
+                    except Exception as e:
+                        self.log(f"💥 Error processing {date_str}: {e}")
+                        break
+            finally:
+                stop.set() # Abort look-ahead downloads instead of waiting them out
 
     def mark_month_done(self, year_month):
         # Fill state for all days of the month to avoid re-checking
@@ -121,9 +438,7 @@ class DataHarvester:
         import calendar
         _, last_day = calendar.monthrange(y, m)
         for d in range(1, last_day + 1):
-            d_str = f"{y}-{m:02d}-{d:02d}"
-            if d_str not in self.state["processed_days"]:
-                self.state["processed_days"].append(d_str)
+            self.mark_processed(f"{y}-{m:02d}-{d:02d}")
         self.save_state()
 
     def process_daily_file(self, filename, date_str, stop_signal=None):
@@ -136,7 +451,6 @@ class DataHarvester:
         HOUR_US = 3600 * 1_000_000
         last_hour_idx = None
         
-        reader = pd.read_csv(gz_path, compression='gzip', chunksize=1_000_000)
         cols_to_keep = [
             'snapshot_time', 'symbol', 'type', 'strike_price', 'expiration', 
             'open_interest', 'last_price', 'bid_price', 'bid_iv', 'ask_price', 
@@ -144,63 +458,82 @@ class DataHarvester:
             'delta', 'gamma', 'vega', 'theta', 'rho'
         ]
 
+        # Parse only the columns snapshots use, with compact dtypes (header casing varies between dumps)
+        with _gzip.open(gz_path, 'rb') as f:
+            header = pd.read_csv(f, nrows=0).columns
+        wanted = set(cols_to_keep) | {'timestamp'}
+        usecols = [c for c in header if c.lower() in wanted]
+        rename_map = {c: c.lower() for c in usecols if c != c.lower()}
+        dtypes = {c: CSV_DTYPES[c.lower()] for c in usecols if c.lower() in CSV_DTYPES}
+
         chunk_count = 0
         total_rows_processed = 0
         start_t = time.time()
-        for chunk in reader:
-            if stop_signal and stop_signal():
-                self.log(f"  🛑 {date_str}: Processing interrupted by user.")
-                raise InterruptedError("Stopped")
+        file_size = os.path.getsize(gz_path) # Fixed for the whole read
+        file_size_mb = file_size / (1024*1024)
+        # Arrow's typed CSV reader when available (isal/gzip + pandas otherwise); closing() shuts the file on interrupt
+        with contextlib.closing(_read_csv_chunks(gz_path, usecols, dtypes)) as reader:
+            for chunk, consumed in reader:
+                if stop_signal and stop_signal():
+                    self.log(f"  🛑 {date_str}: Processing interrupted by user.")
+                    raise InterruptedError("Stopped")
 
-            chunk_count += 1
-            total_rows_processed += len(chunk)
-            
-            # Structured Progress Update
-            elapsed = time.time() - start_t
-            rows_per_sec = total_rows_processed / elapsed if elapsed > 0 else 0
-            pct = min(99.0, (chunk_count / 30) * 100) 
+                chunk_count += 1
+                total_rows_processed += len(chunk)
             
-            # File size info for UI consistency
-            file_size_mb = os.path.getsize(gz_path) / (1024*1024)
-            proc_mb = (pct/100.0) * file_size_mb
-
-            self.log(f"PROGRESS:{date_str}|Parsing CSV|{pct:.1f}|{rows_per_sec/1000:.1f}k r/s|{filename}|{proc_mb:.1f}|{file_size_mb:.1f}")
-            chunk.columns = [c.lower() for c in chunk.columns]
-            chunk['is_btc'] = chunk['symbol'].str.startswith('BTC')
-            chunk['hour_idx'] = chunk['timestamp'] // HOUR_US
+                # Structured Progress Update
+                elapsed = time.time() - start_t
+                rows_per_sec = total_rows_processed / elapsed if elapsed > 0 else 0
+                pct = min(99.0, (consumed / file_size) * 100) if file_size else 0.0
+
+                self.log(PARSE_PROGRESS_FMT.format(date=date_str, pct=pct, krps=rows_per_sec/1000, name=filename,
+                                                   done_mb=consumed / (1024*1024), total_mb=file_size_mb))
+                if rename_map:
+                    chunk.rename(columns=rename_map, inplace=True)
+                sym = chunk['symbol']
+                if isinstance(sym.dtype, pd.CategoricalDtype):
+                    # Test each distinct symbol once, then broadcast through the category codes
+                    btc_cats = sym.cat.categories.str.startswith('BTC').to_numpy()
+                    chunk['is_btc'] = btc_cats[sym.cat.codes.to_numpy()]
+                else:
+                    chunk['is_btc'] = sym.str.startswith('BTC')
+                chunk['hour_idx'] = chunk['timestamp'] // HOUR_US
             
-            for h_idx in chunk['hour_idx'].unique():
-                if last_hour_idx is not None and h_idx != last_hour_idx:
-                    snap_time = datetime.fromtimestamp((last_hour_idx * HOUR_US) / 1_000_000)
-                    snap_ts_us = last_hour_idx * HOUR_US
+                # One partitioning pass per chunk instead of a boolean scan per hour
+                for h_idx, hour_data in chunk.groupby('hour_idx', sort=True):
+                    if last_hour_idx is not None and h_idx != last_hour_idx:
+                        snap_time = datetime.fromtimestamp((last_hour_idx * HOUR_US) / 1_000_000)
+                        snap_ts_us = last_hour_idx * HOUR_US
                     
-                    for coin in ['BTC', 'ETH']:
-                        state_dict = self.market_state[coin]
-                        if state_dict:
-                            # CRITICAL: Prune expired instruments BEFORE creating snapshot
-                            # Deribit 'expiration' is in microseconds US
-                            expired_keys = [s for s, data in state_dict.items() if data.get('expiration', 0) < snap_ts_us]
-                            for k in expired_keys:
-                                del state_dict[k]
+                        for coin in ['BTC', 'ETH']:
+                            coin_state = self.market_state[coin]
+                            if coin_state:
+                                # CRITICAL: Prune expired instruments BEFORE creating snapshot
+                                # Deribit 'expiration' is in microseconds US
+                                coin_state.prune(snap_ts_us)
                             
-                            if state_dict:
-                                df_snap = pd.DataFrame(state_dict.values())
-                                df_snap['snapshot_time'] = snap_time
-                                target_list = btc_snapshots if coin == 'BTC' else eth_snapshots
-                                target_list.append(df_snap[[c for c in cols_to_keep if c in df_snap.columns]])
+                                if coin_state:
+                                    df_snap = coin_state.snapshot()
+                                    df_snap['snapshot_time'] = snap_time
+                                    target_list = btc_snapshots if coin == 'BTC' else eth_snapshots
+                                    target_list.append(df_snap[[c for c in cols_to_keep if c in df_snap.columns]])
                 
-                # Update MARKET STATE
-                hour_data = chunk[chunk['hour_idx'] == h_idx]
-                updates = hour_data.sort_values('timestamp').drop_duplicates('symbol', keep='last')
-                for _, row in updates.iterrows():
-                    coin = 'BTC' if row['is_btc'] else 'ETH'
-                    self.market_state[coin][row['symbol']] = row.to_dict()
-                last_hour_idx = h_idx
+                    # Update MARKET STATE
+                    # Tardis dumps are time-ordered; only sort when a chunk is not
+                    if not hour_data['timestamp'].is_monotonic_increasing:
+                        hour_data = hour_data.sort_values('timestamp', kind='stable')
+                    updates = hour_data.drop_duplicates('symbol', keep='last')
+                    # Column-wise upsert per coin (slot writes, no per-row dicts)
+                    is_btc = updates['is_btc'].to_numpy()
+                    for coin, rows in (('BTC', updates[is_btc]), ('ETH', updates[~is_btc])):
+                        if not rows.empty:
+                            self.market_state[coin].update(rows)
+                    last_hour_idx = h_idx
 
         # Save to staging
         for coin, snaps in [('BTC', btc_snapshots), ('ETH', eth_snapshots)]:
             if snaps:
-                df_day = pd.concat(snaps, ignore_index=True)
+                df_day = add_derived_columns(pd.concat(snaps, ignore_index=True))
                 out_path = os.path.join(STAGING_DIR, f"{coin}_{date_str}.snap")
                 df_day.to_parquet(out_path, compression='snappy')
 
@@ -221,12 +554,12 @@ class DataHarvester:
         all_present = True
         if not demo_mode:
             for d in range(1, days_to_check + 1):
-                if f"{year_month}-{d:02d}" not in self.state["processed_days"]:
+                if f"{year_month}-{d:02d}" not in self.processed_days:
                     all_present = False
                     break
         else:
             # In demo mode, we just need the 1st day to be done
-            all_present = f"{year_month}-01" in self.state["processed_days"]
+            all_present = f"{year_month}-01" in self.processed_days
         
         if all_present:
             self.log(f"📦 Consolidating Month {year_month}...")
@@ -234,10 +567,8 @@ class DataHarvester:
             for coin in ['BTC', 'ETH']:
                 daily_files = sorted(glob.glob(os.path.join(STAGING_DIR, f"{coin}_{year_month}-*.snap")))
                 if daily_files:
-                    dfs = [pd.read_parquet(f) for f in daily_files]
-                    df_month = pd.concat(dfs, ignore_index=True)
                     out_path = os.path.join(PROCESSED_DIR, f"{coin}_{year_month}.parquet")
-                    df_month.to_parquet(out_path, compression='snappy')
+                    _consolidate_days(daily_files, out_path)
                     # Cleanup staging
                     for f in daily_files: os.remove(f)
                     self.log(f"  ✅ Finalized {coin}_{year_month}.parquet")
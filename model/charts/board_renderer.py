@@ -5,6 +5,8 @@ Renders options board with Greeks enrichment using hybrid NN+BS approach.
 Inherits from BaseChartBuilder for consistent interface.
 """
 
+from functools import lru_cache
+
 import pandas as pd
 import dash_bootstrap_components as dbc
 import dash_ag_grid as dag
@@ -12,10 +14,31 @@ from dash import html
 
 from config.theme import CUSTOM_CSS, GLOBAL_CHART_STYLE
 from config.dashboard_config import RISK_FREE_RATE
-from core.black_scholes import black_scholes_safe
+from core.black_scholes import bs_price_gamma_theta
 from charts.base_chart import BaseChartBuilder
 
 
+# Grid settings shared by every DTE tab (built once, not per tab per render)
+_DEFAULT_COL_DEF = {"sortable": True, "filter": True, "resizable": True}
+_BASE_GRID_OPTIONS = {
+    "headerHeight": 28,  # Reduce header height
+    "rowHeight": 35,
+    "rowSelection": "single",
+}
+
+
+@lru_cache(maxsize=1024)
+def _parse_date(s):
+    """Parsed expiry / snapshot timestamp; the same strings come back on every redraw."""
+    return pd.Timestamp(s)
+
+
+@lru_cache(maxsize=256)
+def _sorted_dates(dates):
+    # Tuple, not list: the cached result is shared by every later render
+    return tuple(sorted(dates))
+
+
 class BoardRenderer(BaseChartBuilder):
     """
     Renders options board with AG Grid.
@@ -32,34 +55,24 @@ class BoardRenderer(BaseChartBuilder):
         """Initialize BoardRenderer with optional service dependency."""
         super().__init__()
         self.greeks_service = greeks_service
+        self._column_defs = self._build_grid_columns()  # Static: reused by every tab
     
-    def _enrich_with_bs_greeks(self, row, spot, T, option_type):
+    def _with_bs_greeks(self, df, spot, T, option_type):
         """
-        Enrich predictions with BS Greeks.
+        BS price, gamma and theta for a whole side of the board in one vectorized call.
         
-        Args:
-            row: DataFrame row with model predictions
-            spot: Current spot price
-            T: Time to expiration in years
-            option_type: 'call' or 'put'
-            
         Returns:
-            pd.Series with price, gamma, theta from BS
+            df with price, gamma, theta columns from BS
         """
-        greeks = black_scholes_safe(
-            S=spot,
-            K=row['strike'],
-            T=T,
-            r=RISK_FREE_RATE,  # 0.0 для крипты
-            sigma=row['mark_iv'] / 100,  # Конвертируем % → доли
-            option_type=option_type
+        price, gamma, theta = bs_price_gamma_theta(
+            spot,
+            df['strike'].to_numpy(dtype=float),
+            T,
+            RISK_FREE_RATE,
+            df['mark_iv'].to_numpy(dtype=float) / 100.0,
+            option_type
         )
-        
-        return pd.Series({
-            'price': greeks['price'],
-            'gamma': greeks['gamma'],  # ← Из BS (точнее в 4.5x!)
-            'theta': greeks['theta']   # ← Из BS
-        })
+        return df.assign(price=price, gamma=gamma, theta=theta)
     
     def _build_grid_columns(self):
         """
@@ -126,13 +139,13 @@ class BoardRenderer(BaseChartBuilder):
         Returns:
             dbc.Tabs component or html.Div if no data
         """
-        current_date = pd.to_datetime(market_state['target_ts'])
-        sorted_sel_dates = sorted(selected_dtes)  # Sort chronologically
+        current_date = _parse_date(str(market_state['target_ts']))
+        sorted_sel_dates = _sorted_dates(tuple(selected_dtes))  # Sort chronologically
         spot = market_state['underlying_price']
         
         tabs = []
         for date_str in sorted_sel_dates:
-            exp_date = pd.to_datetime(date_str)
+            exp_date = _parse_date(date_str)
             dte = (exp_date - current_date).days
             if dte < 0:
                 continue
@@ -154,22 +167,12 @@ class BoardRenderer(BaseChartBuilder):
             calls = df_dte[df_dte['type'] == 'call'].copy()
             puts = df_dte[df_dte['type'] == 'put'].copy()
             
-            # Обогащаем Call опционы
+            # Обогащаем Call/Put опционы: one vectorized BS pass per side
             # calls уже содержит: ['strike', 'mark_iv', 'delta', 'vega'] из модели
-            calls_bs = calls.apply(
-                lambda row: self._enrich_with_bs_greeks(row, spot, T, 'call'),
-                axis=1
-            )
-            calls = pd.concat([calls, calls_bs], axis=1)
+            calls = self._with_bs_greeks(calls, spot, T, 'call')
+            puts = self._with_bs_greeks(puts, spot, T, 'put')
             # Теперь calls: ['strike', 'mark_iv', 'delta', 'vega', 'price', 'gamma', 'theta']
             
-            # Обогащаем Put опционы
-            puts_bs = puts.apply(
-                lambda row: self._enrich_with_bs_greeks(row, spot, T, 'put'),
-                axis=1
-            )
-            puts = pd.concat([puts, puts_bs], axis=1)
-            
             calls.set_index('strike', inplace=True)
             puts.set_index('strike', inplace=True)
             
@@ -183,21 +186,18 @@ class BoardRenderer(BaseChartBuilder):
             # After reset_index, the index column is named 'strike' (from set_index)
             combined.rename(columns={'strike': 'strike_price'}, inplace=True)
             
-            # Calculate ATM strike
-            atm_strike = combined.iloc[
-                (combined['strike_price'] - spot).abs().argsort()[:1]
-            ]['strike_price'].values[0] if not combined.empty else 0
+            # Calculate ATM strike (O(N) argmin instead of a full argsort)
+            strikes = combined['strike_price'].to_numpy()
+            atm_strike = strikes[abs(strikes - spot).argmin()] if strikes.size else 0
             
             # Build grid
             grid = dag.AgGrid(
                 id={'type': 'options-grid', 'date': date_str},  # Pattern matching ID
                 rowData=combined.to_dict('records'),
-                columnDefs=self._build_grid_columns(),
-                defaultColDef={"sortable": True, "filter": True, "resizable": True},
+                columnDefs=self._column_defs,
+                defaultColDef=_DEFAULT_COL_DEF,
                 dashGridOptions={
-                    "headerHeight": 28,  # Reduce header height
-                    "rowHeight": 35,
-                    "rowSelection": "single",
+                    **_BASE_GRID_OPTIONS,
                     "getRowStyle": {
                         "styleConditions": [
                             {
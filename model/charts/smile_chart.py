@@ -7,11 +7,29 @@ Renders volatility smile chart with cubic spline interpolation.
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-from scipy.interpolate import make_interp_spline
 from dash import dcc, html
 
 from config.theme import CUSTOM_CSS, GLOBAL_CHART_STYLE, style_card
+from core.fast_spline import natural_cubic_spline
+
+
+# plotly.express.colors.qualitative.Plotly, inlined so plotly.express is never imported
+_COLORS = ('#636EFA', '#EF553B', '#00CC96', '#AB63FA', '#FFA15A',
+           '#19D3F3', '#FF6692', '#B6E880', '#FF97FF', '#FECB52')
+SMILE_MIN_CURVE_POINTS = 60  # Shared-grid samples guaranteed inside the narrowest curve's strike range
+SMILE_MAX_GRID_POINTS = 2000  # Cap on the shared grid over all DTEs
+
+# Static part of the smile layout, built once instead of on every render
+_SMILE_LAYOUT = dict(
+    xaxis_title="Strike", 
+    yaxis_title="IV (%)",
+    plot_bgcolor="white", 
+    paper_bgcolor="white", 
+    font={"color": CUSTOM_CSS["text_primary"]},
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+    margin=dict(t=50, b=50, l=50, r=20),
+    hovermode="x unified"
+)
 
 
 def render_smile_chart(df, market_state, selected_dtes):
@@ -28,21 +46,33 @@ def render_smile_chart(df, market_state, selected_dtes):
     """
     # selected_dtes are date strings
     current_date = pd.to_datetime(market_state['target_ts'])
-    selected_dte_ints = [(pd.to_datetime(v) - current_date).days for v in selected_dtes]
+    selected_dte_ints = (pd.to_datetime(pd.Index(selected_dtes)) - current_date).days
     df_view = df[df['dte'].isin(selected_dte_ints)]
     
     # Plot just Calls IV (standard convention for Smile)
-    df_plot = df_view[df_view['type'] == 'call'].copy()
+    df_plot = df_view.loc[df_view['type'] == 'call', ['strike', 'mark_iv', 'dte']]
 
     fig = go.Figure()
-    colors = px.colors.qualitative.Plotly
+    colors = _COLORS
+    traces = []  # Added in one add_traces() call (single validation pass)
+    groups = df_plot.sort_values('strike').groupby('dte', sort=True)
     
-    dtes = sorted(df_plot['dte'].unique())
-    for i, dte in enumerate(dtes):
-        df_dte = df_plot[df_plot['dte'] == dte].sort_values('strike')
+    # One strike grid shared by every curve, each masked to its own [min, max]. The step is
+    # fine enough that the narrowest splined curve still gets SMILE_MIN_CURVE_POINTS samples
+    # (capped at SMILE_MAX_GRID_POINTS over the full range, where narrow curves get fewer).
+    ranges = groups['strike'].agg(['min', 'max', 'size'])
+    ranges = ranges[ranges['size'] >= 4]
+    if not ranges.empty:
+        lo, hi = ranges['min'].min(), ranges['max'].max()
+        narrowest = (ranges['max'] - ranges['min']).min()
+        step = max(narrowest / SMILE_MIN_CURVE_POINTS, (hi - lo) / SMILE_MAX_GRID_POINTS)
+        x_grid = lo + np.arange(int((hi - lo) / step) + 2) * step if step > 0 else np.array([lo])
+    
+    # One sort + one groupby pass instead of a full-frame filter per DTE
+    for i, (dte, df_dte) in enumerate(groups):
         
         # Show actual points
-        fig.add_trace(go.Scatter(
+        traces.append(go.Scatter(
             x=df_dte['strike'], 
             y=df_dte['mark_iv'],
             mode='markers',
@@ -55,18 +85,19 @@ def render_smile_chart(df, market_state, selected_dtes):
         if len(df_dte) >= 4:
             try:
                 x, y = df_dte['strike'].values, df_dte['mark_iv'].values
-                x_new = np.linspace(x.min(), x.max(), 200)
-                spl = make_interp_spline(x, y, k=3)
-                fig.add_trace(go.Scatter(
+                # Slice of the shared grid inside this DTE's strikes, plus its exact end points
+                inner = x_grid[(x_grid > x[0]) & (x_grid < x[-1])]
+                x_new = np.concatenate(([x[0]], inner, [x[-1]]))
+                traces.append(go.Scatter(
                     x=x_new, 
-                    y=spl(x_new),
+                    y=natural_cubic_spline(x, y, x_new),
                     mode='lines',
                     name=f"{dte} DTE",
                     line=dict(width=2, color=colors[i % len(colors)])
                 ))
             except:
                 # Fallback to simple line
-                fig.add_trace(go.Scatter(
+                traces.append(go.Scatter(
                     x=df_dte['strike'], 
                     y=df_dte['mark_iv'],
                     mode='lines',
@@ -74,13 +105,15 @@ def render_smile_chart(df, market_state, selected_dtes):
                     line=dict(width=2, color=colors[i % len(colors)])
                 ))
         else:
-            fig.add_trace(go.Scatter(
+            traces.append(go.Scatter(
                 x=df_dte['strike'], 
                 y=df_dte['mark_iv'],
                 mode='lines+markers',
                 name=f"{dte} DTE",
                 line=dict(width=2, color=colors[i % len(colors)])
             ))
+    
+    fig.add_traces(traces)
         
     # Add spot line with annotation (matching main dashboard style)
     spot = market_state['underlying_price']
@@ -95,17 +128,7 @@ def render_smile_chart(df, market_state, selected_dtes):
         annotation_font_color="gray"
     )
     
-    fig.update_layout(
-        title="Volatility Smile (Cubic Spline)",
-        xaxis_title="Strike", 
-        yaxis_title="IV (%)",
-        plot_bgcolor="white", 
-        paper_bgcolor="white", 
-        font={"color": CUSTOM_CSS["text_primary"]},
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        margin=dict(t=50, b=50, l=50, r=20),
-        hovermode="x unified"
-    )
+    fig.update_layout(**_SMILE_LAYOUT, title="Volatility Smile (Cubic Spline)")
     
     return html.Div([
         dcc.Graph(figure=fig, style=GLOBAL_CHART_STYLE)
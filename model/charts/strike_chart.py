@@ -5,17 +5,29 @@ Renders strike chart with OHLC candlesticks and optional IV/Theta subplots.
 Inherits from BaseChartBuilder for consistent interface.
 """
 
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from dash import dcc, html
 
-from config.theme import CUSTOM_CSS, CHART_THEME, GLOBAL_CHART_STYLE, style_card, apply_chart_theme
+from config.theme import CUSTOM_CSS, ACCENT_RGB, CHART_THEME, GLOBAL_CHART_STYLE, style_card, apply_chart_theme
 from config.dashboard_config import RISK_FREE_RATE, SUBPLOT_CONFIG
-from core.black_scholes import black_scholes_safe
+from core.black_scholes import bs_price_gamma_theta
 from charts.base_chart import BaseChartBuilder
 
 
+logger = logging.getLogger(__name__)
+
+HISTORY_CACHE_SIZE = 32  # Priced histories kept per (currency, strike, type, expiry)
+_HISTORY_FIELDS = ('close', 'iv', 'theta', 'spot')
+
+
 class StrikeChartBuilder(BaseChartBuilder):
     """
     Builds strike chart with OHLC candlesticks and dynamic subplots.
@@ -37,117 +49,178 @@ class StrikeChartBuilder(BaseChartBuilder):
         self.provider = provider
         self.timeseries_provider = timeseries_provider
         self.greeks_service = greeks_service
+        # Provider history is static, and slider redraws ask for the same dates again.
+        # One slot per day of this provider's history, so the cache is per builder.
+        self._cached_market_state = lru_cache(maxsize=max(1, len(provider.get_date_range())))(
+            provider.get_market_state
+        )
+        # Priced history per contract: moving the slider forward only prices the new dates
+        self._history = OrderedDict()
+        self._history_lock = threading.Lock()
     
-    def _generate_ohlc_data(self, strike, option_type, exp_date, current_time, timestamps_store, currency):
+    def _market_state(self, date):
         """
-        Generate OHLC data for the option using model predictions.
+        Cached provider market state for date, returned as a fresh dict.
         
-        Returns:
-            tuple: (ohlc_df, base_df) or (None, None) if no data
+        The cached dict itself is never handed out, so a caller mutating its
+        state cannot leak into later redraws.
         """
-        current_dt = pd.to_datetime(current_time)
-        exp_dt = pd.to_datetime(exp_date)
-        
-        prices_data = []
-        base_prices = []
+        state = self._cached_market_state(date)
+        return dict(state) if state else state
+    
+    def _price_dates(self, strike, option_type, exp_dt, ts_index):
+        """
+        Model IV + BS price/theta for one strike on every date of ts_index.
         
-        for date_str in timestamps_store:
-            date = pd.to_datetime(date_str)
-            
-            # Only generate for dates up to current slider position
-            if date > current_dt:
-                continue
-            
-            # Only generate for dates before expiration
-            if date > exp_dt:
-                continue
-            
-            # Calculate DTE
-            dte = (exp_dt - date).days
-            if dte <= 0:
-                continue
-            
+        Dates without a usable market state or IV are dropped (one missing
+        point, as with the per-date loop), the rest are priced. Returns a dict
+        of aligned arrays: timestamp, close, iv (%), theta, spot.
+        """
+        dates, states, spots, dtes = [], [], [], []
+        for date, dte in zip(ts_index, (exp_dt - ts_index).days):
             # Get market state for this date
             try:
-                state = self.provider.get_market_state(date)
+                state = self._market_state(date)
                 if not state:
                     continue
-                
-                spot = state['underlying_price']
-                
-                # Model predicts IV for this strike
-                result = self.model.predict(
-                    market_state=state,
-                    strikes=[strike],
-                    dte_days=dte,
-                    is_call=(option_type == 'call')
-                )
-                
-                # Get IV from model (model returns in %)
-                iv = result['mark_iv'].iloc[0] / 100.0
-                
-                # Calculate Greeks using Black-Scholes
-                T = dte / 365.0
-                greeks = black_scholes_safe(
-                    S=spot,
-                    K=strike,
-                    T=T,
-                    r=RISK_FREE_RATE,
-                    sigma=iv,
-                    option_type=option_type
-                )
-                
-                prices_data.append({
-                    'timestamp': date,
-                    'price': greeks['price'],
-                    'iv': iv * 100.0,
-                    'theta': greeks['theta']
-                })
-                
-                base_prices.append({
-                    'timestamp': date,
-                    'price': spot
-                })
-                
+                spot = float(state['underlying_price'])
             except Exception as e:
-                print(f"Error generating data for {date}: {e}")
+                logger.warning("Error generating data for %s: %s", date, e)
                 continue
+            if not (np.isfinite(spot) and spot > 0):
+                logger.warning("Skipping %s: invalid underlying price %r", date, spot)
+                continue
+            
+            dates.append(date)
+            states.append(state)
+            spots.append(spot)
+            dtes.append(dte)
         
-        if not prices_data:
-            return None, None
+        spots = np.asarray(spots, dtype=float)
+        dtes = np.asarray(dtes, dtype=float)
+        iv = self._predict_iv(states, strike, dtes, option_type) if dates else np.empty(0)
         
-        # Process prices to compute OHLC
-        ohlc_data = []
-        prev_price = None
-        for item in prices_data:
-            price = item['price']
-            open_price = prev_price if prev_price is not None else price
-            
-            high_price = max(open_price, price)
-            low_price = min(open_price, price)
+        valid = np.isfinite(iv)
+        if not valid.all():
+            logger.warning("Dropping %d dates without a valid IV for %s %s", int((~valid).sum()), strike, option_type)
+        dates = pd.DatetimeIndex(dates)[valid]
+        spots, dtes, iv = spots[valid], dtes[valid], iv[valid]
+        
+        if not len(dates):
+            return {'timestamp': dates, **{f: np.empty(0) for f in _HISTORY_FIELDS}}
+        
+        # Price/theta via Black-Scholes over all dates at once (Numba kernel if available)
+        closes, _, thetas = bs_price_gamma_theta(
+            spots, strike, dtes / 365.0, RISK_FREE_RATE, iv, option_type
+        )
+        return {'timestamp': dates, 'close': closes, 'iv': iv * 100.0, 'theta': thetas, 'spot': spots}
+    
+    def _predict_iv(self, states, strike, dtes, option_type):
+        """
+        Model IV (as a fraction) for one strike on each state, NaN where it fails.
+        
+        One forward pass for all dates; if the batch raises, retries date by
+        date so a single bad state costs only its own point.
+        """
+        def predict(rows):
+            result = self.model.predict_batch(
+                market_states=[states[i] for i in rows],
+                strikes=np.full(len(rows), strike, dtype=float),
+                dte_days=dtes[rows],
+                is_call=(option_type == 'call')
+            )
+            # Model returns IV in %
+            return result['mark_iv'].to_numpy(dtype=float) / 100.0
+        
+        try:
+            return predict(np.arange(len(states)))
+        except Exception as e:
+            logger.warning("Batch IV prediction failed for %s %s, retrying per date: %s", strike, option_type, e)
+        
+        iv = np.full(len(states), np.nan)
+        for i in range(len(states)):
+            try:
+                iv[i] = predict(np.array([i]))[0]
+            except Exception as e:
+                logger.warning("Error predicting IV for %s %s on row %d: %s", strike, option_type, i, e)
+        return iv
+    
+    def _generate_ohlc_data(self, strike, option_type, exp_dt, current_dt, timestamps_store, currency):
+        """
+        Generate OHLC data for the option using model predictions.
+        
+        exp_dt / current_dt are pd.Timestamps parsed once by render().
+        Prices are cached per contract up to the furthest slider position seen,
+        so a slider step forward prices only the newly revealed dates and a
+        step back is a slice.
+        
+        Returns:
+            tuple: (ohlc_df, base_df) or (None, None) if no data
+        """
+        # 1. Dates to price (one vectorized parse/filter): before expiration, DTE > 0
+        ts_index = pd.to_datetime(pd.Index(timestamps_store))
+        ts_index = ts_index[(ts_index <= exp_dt) & ((exp_dt - ts_index).days > 0)]
+        
+        key = (currency, float(strike), option_type, exp_dt)
+        store_sig = (len(timestamps_store), timestamps_store[0], timestamps_store[-1])
+        with self._history_lock:
+            entry = self._history.get(key)
+        if entry is None or entry['store_sig'] != store_sig:
+            entry = {'store_sig': store_sig, 'covered_until': None, 'timestamp': ts_index[:0],
+                     **{f: np.empty(0) for f in _HISTORY_FIELDS}}
+        
+        # 2. Price only the dates past what the cache already covers
+        if entry['covered_until'] is None or current_dt > entry['covered_until']:
+            todo = ts_index[ts_index <= current_dt]
+            if entry['covered_until'] is not None:
+                todo = todo[todo > entry['covered_until']]
+            priced = self._price_dates(strike, option_type, exp_dt, todo)
             
-            ohlc_data.append({
-                'timestamp': item['timestamp'],
-                'open': open_price,
-                'high': high_price,
-                'low': low_price,
-                'close': price,
-                'iv': item.get('iv', 0),
-                'theta': item.get('theta', 0)
-            })
-            prev_price = price
-        
-        ohlc_df = pd.DataFrame(ohlc_data)
-        base_df = pd.DataFrame(base_prices)
+            entry = {
+                'store_sig': store_sig,
+                'covered_until': current_dt,
+                'timestamp': entry['timestamp'].append(priced['timestamp']),
+                **{f: np.concatenate((entry[f], priced[f])) for f in _HISTORY_FIELDS}
+            }
+        
+        with self._history_lock:
+            self._history[key] = entry
+            self._history.move_to_end(key)
+            while len(self._history) > HISTORY_CACHE_SIZE:
+                self._history.popitem(last=False)
+        
+        # 3. Slice to the current slider position
+        visible = entry['timestamp'] <= current_dt
+        if not visible.any():
+            return None, None
+        timestamps = entry['timestamp'][visible]
+        closes, iv, thetas, spots = (entry[f][visible] for f in _HISTORY_FIELDS)
+        
+        # Process prices to compute OHLC: each candle opens at the previous close
+        opens = np.empty_like(closes)
+        opens[0] = closes[0]
+        opens[1:] = closes[:-1]
+        highs = np.maximum(opens, closes)
+        lows = np.minimum(opens, closes)
+        
+        # Columnar build straight from the arrays (no per-row dicts, no extra copies)
+        ohlc_df = pd.DataFrame({
+            'timestamp': timestamps,
+            'open': opens,
+            'high': highs,
+            'low': lows,
+            'close': closes,
+            'iv': iv,
+            'theta': thetas
+        }, copy=False)
+        base_df = pd.DataFrame({'timestamp': timestamps, 'price': spots}, copy=False)
         
         return ohlc_df, base_df
     
-    def _build_figure(self, ohlc_df, base_df, strike, option_type, exp_date, currency, current_time, visible_charts):
+    def _build_figure(self, ohlc_df, base_df, strike, option_type, exp_dt, currency, current_dt, visible_charts):
         """
         Build the plotly figure with candlesticks and subplots.
         """
-        current_dt = pd.to_datetime(current_time)
-        exp_dt = pd.to_datetime(exp_date)
         dte = (exp_dt - current_dt).days
         type_color = CUSTOM_CSS["accent_call"] if option_type == 'call' else CUSTOM_CSS["accent_put"]
         
@@ -201,8 +274,11 @@ class StrikeChartBuilder(BaseChartBuilder):
             specs=specs
         )
         
+        # Collect (trace, row, secondary_y) and add them in one add_traces() call
+        traces, rows, secondary_ys = [], [], []
+        
         # Add candlestick trace
-        fig.add_trace(go.Candlestick(
+        traces.append(go.Candlestick(
             x=ohlc_df['timestamp'],
             open=ohlc_df['open'],
             high=ohlc_df['high'],
@@ -211,30 +287,37 @@ class StrikeChartBuilder(BaseChartBuilder):
             name=f"{option_type.upper()} Price",
             increasing_line_color=CUSTOM_CSS["accent_call"],
             decreasing_line_color=CUSTOM_CSS["accent_put"]
-        ), row=1, col=1, secondary_y=False)
+        ))
+        rows.append(1)
+        secondary_ys.append(False)
         
         # Add spot price overlay
         if not base_df.empty:
-            fig.add_trace(go.Scatter(
+            traces.append(go.Scatter(
                 x=base_df['timestamp'],
                 y=base_df['price'],
                 name=f"{currency} Spot",
                 line=dict(color='rgba(150, 150, 150, 0.6)', width=2, dash='dash')
-            ), row=1, col=1, secondary_y=True)
+            ))
+            rows.append(1)
+            secondary_ys.append(True)
         
         # Add subplot traces
         for i, metric_key in enumerate(active_subplots):
-            row_idx = i + 2
             config = SUBPLOT_CONFIG[metric_key]
             
-            fig.add_trace(go.Scatter(
+            traces.append(go.Scatter(
                 x=ohlc_df['timestamp'],
                 y=ohlc_df[config['data_col']],
                 name=config['title'],
                 line=dict(color=config['color'], width=2),
                 fill='tozeroy',
                 fillcolor='rgba(155, 89, 182, 0.1)' if metric_key == 'iv' else 'rgba(230, 126, 34, 0.1)'
-            ), row=row_idx, col=1)
+            ))
+            rows.append(i + 2)
+            secondary_ys.append(False)
+        
+        fig.add_traces(traces, rows=rows, cols=[1] * len(traces), secondary_ys=secondary_ys)
         
         # Add horizontal lines for current prices
         current_option_price = ohlc_df.iloc[-1]['close'] if not ohlc_df.empty else None
@@ -247,7 +330,7 @@ class StrikeChartBuilder(BaseChartBuilder):
                 yref="y", y0=current_option_price, y1=current_option_price,
                 line=dict(
                     width=1.5,
-                    color=f"rgba({int(type_color[1:3], 16)}, {int(type_color[3:5], 16)}, {int(type_color[5:7], 16)}, 0.4)"
+                    color="rgba({}, {}, {}, 0.4)".format(*ACCENT_RGB['call' if option_type == 'call' else 'put'])
                 )
             )
             fig.add_annotation(
@@ -390,13 +473,15 @@ class StrikeChartBuilder(BaseChartBuilder):
         if not current_time or not timestamps_store:
             return html.Div("No time data available", style=style_card)
         
+        # Parse once; the helpers take Timestamps
+        current_dt = pd.Timestamp(current_time)
+        exp_dt = pd.Timestamp(exp_date)
+        
         ohlc_df, base_df = self._generate_ohlc_data(
-            strike, option_type, exp_date, current_time, timestamps_store, currency
+            strike, option_type, exp_dt, current_dt, timestamps_store, currency
         )
         
         if ohlc_df is None or ohlc_df.empty:
-            current_dt = pd.to_datetime(current_time)
-            exp_dt = pd.to_datetime(exp_date)
             dte = (exp_dt - current_dt).days
             return html.Div([
                 debug_info,
@@ -414,7 +499,7 @@ class StrikeChartBuilder(BaseChartBuilder):
         
         # Build figure
         fig = self._build_figure(
-            ohlc_df, base_df, strike, option_type, exp_date, currency, current_time, visible_charts
+            ohlc_df, base_df, strike, option_type, exp_dt, currency, current_dt, visible_charts
         )
         
         return html.Div([
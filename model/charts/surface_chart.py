@@ -4,10 +4,26 @@
 Renders 3D volatility surface visualization.
 """
 
+import numpy as np
 import plotly.graph_objects as go
 from dash import dcc, html
 
 from config.theme import CHART_THEME, GLOBAL_CHART_STYLE, style_card, apply_chart_theme
+from core.surface_grid import bin_iv_surface
+
+
+# Static scene layout, built once instead of on every render
+_SURFACE_LAYOUT = go.Layout(
+    scene=dict(
+        xaxis_title='Strike',
+        yaxis_title='Days to Expiry',
+        zaxis_title='IV (%)',
+        xaxis=dict(gridcolor=CHART_THEME["grid_color"]),
+        yaxis=dict(gridcolor=CHART_THEME["grid_color"]),
+        zaxis=dict(gridcolor=CHART_THEME["grid_color"])
+    )
+)
+_SURFACE_MARGIN = dict(l=0, r=0, b=0, t=40)  # Applied after the theme, which sets its own margin
 
 
 def render_surface_chart(df):
@@ -20,34 +36,22 @@ def render_surface_chart(df):
     Returns:
         html.Div with the 3D chart
     """
-    # Plot Call IV Surface (Show ALL DTEs always)
-    df_surf = df[df['type'] == 'call']
+    # Plot Call IV Surface (Show ALL DTEs always), binned the same way as the dashboard's 3D tab
+    calls = df[df['type'] == 'call']
+    strike_centers, dte_values, z = bin_iv_surface(
+        calls['strike'].to_numpy(), calls['dte'].to_numpy(), calls['mark_iv'].to_numpy()
+    )
     
-    fig_3d = go.Figure(data=[go.Scatter3d(
-        x=df_surf['strike'],
-        y=df_surf['dte'],
-        z=df_surf['mark_iv'],
-        mode='markers',
-        marker=dict(
-            size=3,
-            color=df_surf['mark_iv'],
-            colorscale='Viridis',
-            opacity=0.8
-        )
-    )])
+    # float32 halves the JSON payload; plenty for display
+    fig_3d = go.Figure(data=[go.Surface(
+        x=strike_centers.astype(np.float32),
+        y=dte_values.astype(np.float32),
+        z=z.astype(np.float32),
+        colorscale='Viridis'
+    )], layout=_SURFACE_LAYOUT)
     
     apply_chart_theme(fig_3d, "Volatility Surface (3D)")
-    fig_3d.update_layout(
-        scene=dict(
-            xaxis_title='Strike',
-            yaxis_title='Days to Expiry',
-            zaxis_title='IV (%)',
-            xaxis=dict(gridcolor=CHART_THEME["grid_color"]),
-            yaxis=dict(gridcolor=CHART_THEME["grid_color"]),
-            zaxis=dict(gridcolor=CHART_THEME["grid_color"])
-        ),
-        margin=dict(l=0, r=0, b=0, t=40) 
-    )
+    fig_3d.update_layout(margin=_SURFACE_MARGIN)
     
     return html.Div([
         dcc.Graph(id='volatility-surface-3d', figure=fig_3d, style=GLOBAL_CHART_STYLE)
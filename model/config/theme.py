@@ -15,6 +15,12 @@ CUSTOM_CSS = {
     "accent_iv": "#9B59B6",
 }
 
+# Call/put accents as (r, g, b), parsed once for rgba() strings
+ACCENT_RGB = {
+    side: tuple(int(CUSTOM_CSS[f"accent_{side}"][i:i + 2], 16) for i in (1, 3, 5))
+    for side in ("call", "put")
+}
+
 # Card Style
 style_card = {
     "backgroundColor": CUSTOM_CSS["card_bg"],
@@ -4,8 +4,18 @@ Black-Scholes Option Pricing
 Complete Black-Scholes implementation with all Greeks.
 """
 
+import math
+
 import numpy as np
 from scipy.stats import norm
+from scipy.special import ndtr
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:  # Optional: NumPy/SciPy paths are used without it
+    HAS_NUMBA = False
+    prange = range
 
 
 def black_scholes_safe(S, K, T, r, sigma, option_type='call'):
@@ -172,3 +182,181 @@ def black_scholes_safe(S, K, T, r, sigma, option_type='call'):
         'theta': theta_daily,
         'rho': rho
     }
+
+
+def black_scholes_vec(S, K, T, r, sigma, option_type='call'):
+    """
+    Vectorized black_scholes_safe(): S, K, T and sigma broadcast against each other.
+    
+    Same clamping and NaN/Inf fallbacks as the scalar version, but evaluated in
+    a single NumPy pass - used by the board (one expiry, many strikes) and the
+    strike chart (one strike, many dates) instead of per-row calls.
+    
+    Parameters:
+    -----------
+    S : float or array-like
+        Spot price(s)
+    K : float or array-like
+        Strike price(s)
+    T : float or array-like
+        Time(s) to expiration in years
+    r : float
+        Risk-free rate
+    sigma : array-like
+        Implied volatilities as decimals
+    option_type : str
+        'call' or 'put'
+    
+    Returns:
+    --------
+    dict: {'price', 'delta', 'gamma', 'vega', 'theta', 'rho'} of float64 arrays
+    """
+    S, K, T, sigma = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (S, K, T, sigma))
+    )
+    is_call = option_type == 'call'
+    intrinsic = np.maximum(0.0, S - K) if is_call else np.maximum(0.0, K - S)
+    expired = T <= 0
+    zeros = np.zeros(S.shape)
+    expired_delta = (K < S).astype(np.float64) if is_call else zeros
+    
+    if expired.all():
+        return {
+            'price': intrinsic,
+            'delta': expired_delta.copy(),
+            'gamma': zeros.copy(),
+            'vega': zeros.copy(),
+            'theta': zeros.copy(),
+            'rho': zeros.copy()
+        }
+    
+    if np.any(S[~expired] <= 0) or np.any(K[~expired] <= 0):
+        raise ValueError("Spot и Strike должны быть > 0")
+    
+    T_safe = np.maximum(T, 1.0 / 24 / 365)
+    sigma_safe = np.where(sigma <= 0, 0.05, np.minimum(sigma, 5.0))
+    sqrt_T = np.sqrt(T_safe)
+    disc = np.exp(-r * T_safe)
+    
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        d1 = (np.log(S / K) + (r + 0.5 * sigma_safe**2) * T_safe) / (sigma_safe * sqrt_T)
+        d2 = np.clip(d1 - sigma_safe * sqrt_T, -10, 10)
+        d1 = np.clip(d1, -10, 10)
+        
+        pdf_d1 = np.exp(-0.5 * d1**2) / np.sqrt(2 * np.pi)
+        if is_call:
+            price = S * ndtr(d1) - K * disc * ndtr(d2)
+            delta = ndtr(d1)
+            theta_annual = -(S * pdf_d1 * sigma_safe) / (2 * sqrt_T) - r * K * disc * ndtr(d2)
+            rho = K * T_safe * disc * ndtr(d2) / 100
+        else:
+            price = K * disc * ndtr(-d2) - S * ndtr(-d1)
+            delta = ndtr(d1) - 1
+            theta_annual = -(S * pdf_d1 * sigma_safe) / (2 * sqrt_T) + r * K * disc * ndtr(-d2)
+            rho = -K * T_safe * disc * ndtr(-d2) / 100
+        gamma = pdf_d1 / (S * sigma_safe * sqrt_T)
+        vega = S * pdf_d1 * sqrt_T / 100
+    
+    price = np.maximum(price, 0.0)
+    price = np.where(np.isfinite(price), price, intrinsic)
+    
+    def _finite(x, expired_value=zeros):
+        # Expired rows take the T <= 0 values of black_scholes_safe()
+        return np.where(expired, expired_value, np.where(np.isfinite(x), x, 0.0))
+    
+    return {
+        'price': np.where(expired, intrinsic, price),
+        'delta': _finite(delta, expired_delta),
+        'gamma': _finite(gamma),
+        'vega': _finite(vega),
+        'theta': _finite(theta_annual / 365.0),
+        'rho': _finite(rho)
+    }
+
+
+_SQRT2 = math.sqrt(2.0)
+_SQRT_2PI = math.sqrt(2.0 * math.pi)
+
+
+def bs_pgt_scalar(S, K, T, r, sigma, is_call):
+    """
+    Scalar (price, gamma, theta) with black_scholes_safe() semantics.
+    
+    Plain math-module code so Numba can compile it; fastmath is deliberately
+    off because the NaN/Inf fallbacks rely on IEEE comparisons.
+    """
+    intrinsic = max(0.0, S - K) if is_call else max(0.0, K - S)
+    if T <= 0:
+        return intrinsic, 0.0, 0.0
+    
+    T_safe = max(T, 1.0 / 24 / 365)
+    if sigma <= 0:
+        sigma_safe = 0.05
+    elif sigma > 5.0:
+        sigma_safe = 5.0
+    else:
+        sigma_safe = sigma
+    
+    sqrt_T = math.sqrt(T_safe)
+    d1 = (math.log(S / K) + (r + 0.5 * sigma_safe * sigma_safe) * T_safe) / (sigma_safe * sqrt_T)
+    d2 = min(max(d1 - sigma_safe * sqrt_T, -10.0), 10.0)
+    d1 = min(max(d1, -10.0), 10.0)
+    
+    pdf_d1 = math.exp(-0.5 * d1 * d1) / _SQRT_2PI
+    disc = math.exp(-r * T_safe)
+    if is_call:
+        price = S * 0.5 * math.erfc(-d1 / _SQRT2) - K * disc * 0.5 * math.erfc(-d2 / _SQRT2)
+        theta_annual = -(S * pdf_d1 * sigma_safe) / (2 * sqrt_T) - r * K * disc * 0.5 * math.erfc(-d2 / _SQRT2)
+    else:
+        price = K * disc * 0.5 * math.erfc(d2 / _SQRT2) - S * 0.5 * math.erfc(d1 / _SQRT2)
+        theta_annual = -(S * pdf_d1 * sigma_safe) / (2 * sqrt_T) + r * K * disc * 0.5 * math.erfc(d2 / _SQRT2)
+    gamma = pdf_d1 / (S * sigma_safe * sqrt_T)
+    theta = theta_annual / 365.0
+    
+    price = max(price, 0.0)
+    if not math.isfinite(price):
+        price = intrinsic
+    if not math.isfinite(gamma):
+        gamma = 0.0
+    if not math.isfinite(theta):
+        theta = 0.0
+    return price, gamma, theta
+
+
+def _bs_pgt_batch(S, K, T, r, sigma, is_call):
+    # Row-wise over equal-length float64 arrays (inputs broadcast by the caller)
+    n = K.shape[0]
+    price = np.empty(n)
+    gamma = np.empty(n)
+    theta = np.empty(n)
+    for i in prange(n):
+        price[i], gamma[i], theta[i] = bs_pgt_scalar(S[i], K[i], T[i], r, sigma[i], is_call)
+    return price, gamma, theta
+
+
+if HAS_NUMBA:
+    bs_pgt_scalar = njit(cache=True)(bs_pgt_scalar)
+    _bs_pgt_batch = njit(cache=True, parallel=True)(_bs_pgt_batch)
+
+
+def bs_price_gamma_theta(S, K, T, r, sigma, option_type='call'):
+    """
+    BS price, gamma and theta with S, K, T and sigma broadcast against each other.
+    
+    Covers the board (one spot/expiry, many strikes) and the strike chart (one
+    strike, many dates). Runs the parallel Numba kernel when numba is installed,
+    otherwise the NumPy black_scholes_vec(). Returns a (price, gamma, theta)
+    tuple of arrays.
+    """
+    if not HAS_NUMBA:
+        greeks = black_scholes_vec(S, K, T, r, sigma, option_type)
+        return greeks['price'], greeks['gamma'], greeks['theta']
+    
+    S, K, T, sigma = (
+        np.ascontiguousarray(x.ravel())
+        for x in np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (S, K, T, sigma)))
+    )
+    live = T > 0
+    if np.any(S[live] <= 0) or np.any(K[live] <= 0):
+        raise ValueError("Spot и Strike должны быть > 0")
+    return _bs_pgt_batch(S, K, T, float(r), sigma, option_type == 'call')
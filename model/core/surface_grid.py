@@ -0,0 +1,51 @@
+"""
+IV Surface Grid
+===============
+Bins an option chain onto a (days to expiry x strike bucket) grid for go.Surface.
+
+Shared by the Deribit dashboard and the model analytics app so the 3D
+surface is built, and looks, the same in both.
+"""
+
+import numpy as np
+
+
+SURFACE_STRIKE_BINS = 40  # Strike buckets per expiry sent to the browser
+
+
+def bin_iv_surface(strikes, dtes, ivs, bins=SURFACE_STRIKE_BINS):
+    """
+    Mean IV per (dte, strike bucket): O(expiries x bins) cells instead of one point per contract.
+    
+    Parameters:
+    -----------
+    strikes, dtes, ivs : array-like
+        Aligned per-contract strike, days to expiry and IV; rows with a
+        non-finite strike/IV or IV <= 0 are ignored
+    bins : int
+        Equal-width strike buckets between the lowest and highest strike
+    
+    Returns:
+    --------
+    tuple: (strike_centers[bins], dte_values[n_dte], z[n_dte, bins]); empty cells are NaN
+    """
+    strikes = np.asarray(strikes, dtype=np.float64)
+    dtes = np.asarray(dtes)
+    ivs = np.asarray(ivs, dtype=np.float64)
+    valid = np.isfinite(strikes) & np.isfinite(ivs) & (ivs > 0)
+    strikes, ivs = strikes[valid], ivs[valid]
+    dte_values, dte_idx = np.unique(dtes[valid], return_inverse=True)
+    
+    if len(strikes):
+        edges = np.linspace(strikes.min(), strikes.max(), bins + 1)
+    else:
+        edges = np.zeros(bins + 1)
+    strike_bin = np.clip(np.searchsorted(edges, strikes, side='right') - 1, 0, bins - 1)
+    cells = len(dte_values) * bins
+    flat = dte_idx * bins + strike_bin
+    iv_sum = np.bincount(flat, weights=ivs, minlength=cells)
+    iv_cnt = np.bincount(flat, minlength=cells)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.where(iv_cnt > 0, iv_sum / iv_cnt, np.nan).reshape(len(dte_values), bins)
+    
+    return (edges[:-1] + edges[1:]) / 2, dte_values, z
@@ -8,6 +8,8 @@ Now uses modular strikes package instead of monolithic engine.
 
 from typing import List, Optional
 
+import numpy as np
+
 # Import from new modular strikes package
 #  Note: Using relative import since this file is in model/ directory
 try:
@@ -18,6 +20,7 @@ try:
         simulate_board_evolution,
         parabolic_distribution_cached,
         CONFIG,
+        get_current_min_step,
         # Re-export expiration functions for backward compatibility
         get_last_friday,
         round_to_nice_tick,
@@ -33,6 +36,7 @@ except ImportError:
         simulate_board_evolution,
         parabolic_distribution_cached,
         CONFIG,
+        get_current_min_step,
         get_last_friday,
         round_to_nice_tick,
         generate_deribit_expirations,
@@ -41,7 +45,6 @@ except ImportError:
     )
 
 
-
 # ==============================================================================
 # ГЕНЕРАЦИЯ СТРАЙКОВ (V5 ULTIMATE)
 # ==============================================================================
@@ -70,17 +73,16 @@ def generate_deribit_strikes(
             dna=dna, price_history=price_history, iv_history=iv_history, target_day=current_day
         )
         
-        table = GridEngine.generate_table()
-        return sorted([int(table[idx]) for idx in final_indices if idx < len(table)])
+        return GridEngine.indices_to_strikes(final_indices)
 
     # 2. FALLBACK: Optimized Unified Logic (V3)
     # Гарантирует 100% совпадение с симуляцией (Day 0) при экстремальной скорости.
     # Использует гипотезу, что для Day 0 буфер слоя Layer 1 всегда равен +/- 2 индекса.
     
-    # 2.1. Basic Params
+    # 2.1. Basic Params (rounded once so find_index and the distribution cache share keys)
     spot_r = round(current_spot, 2)
     vol_r = round(anchor_vol, 4)
-    center_idx = GridEngine.find_index(current_spot)
+    center_idx = GridEngine.find_index(spot_r)
     
     # 2.2. Cached Parabolic Distribution
     raw_indices_tuple = parabolic_distribution_cached(
@@ -92,26 +94,17 @@ def generate_deribit_strikes(
     l1_high = center_idx + 2
     
     # 2.4. Magnet Step Logic
-    min_step = 1
-    if current_dte > CONFIG.MAGNET_THRESHOLD_LONG: min_step = CONFIG.MAGNET_STEP_LONG
-    elif current_dte > CONFIG.MAGNET_THRESHOLD_MID: min_step = CONFIG.MAGNET_STEP_MID
-    else: min_step = CONFIG.MAGNET_STEP_SHORT
+    min_step = get_current_min_step(current_dte)
     step_l3 = max(CONFIG.LAYER3_MIN_STEP, min_step)
     
-    # 2.5. Inline Filtering Loop (Pure Python is fastest here for <100 items)
-    filtered_indices = set()
-    
+    # 2.5. Vectorized snapping: Layer 1 keeps the magnet step, the rest snaps to step_l3
+    raw = np.asarray(raw_indices_tuple, dtype=np.int64)
     if min_step == step_l3:
         # Optimization: No branching needed
-        for idx in raw_indices_tuple:
-            filtered_indices.add((idx // min_step) * min_step)
+        snapped = (raw // min_step) * min_step
     else:
-        for idx in raw_indices_tuple:
-            if l1_low <= idx <= l1_high:
-                filtered_indices.add((idx // min_step) * min_step)
-            else:
-                filtered_indices.add((idx // step_l3) * step_l3)
+        in_l1 = (raw >= l1_low) & (raw <= l1_high)
+        snapped = np.where(in_l1, (raw // min_step) * min_step, (raw // step_l3) * step_l3)
+    filtered_indices = np.unique(snapped)
     
-    table = GridEngine.generate_table()
-    limit = len(table)
-    return sorted([int(table[idx]) for idx in filtered_indices if idx < limit])
+    return GridEngine.indices_to_strikes(filtered_indices)
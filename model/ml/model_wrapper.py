@@ -24,6 +24,21 @@ import pandas as pd
 import numpy as np
 from .model_architecture import ImprovedMultiTaskSVI
 
+# Market features taken from market_state, with the defaults used when a key is missing
+STATE_FEATURE_DEFAULTS = {
+    'Real_IV_ATM': 0.5,
+    'HV_30d': 0.5,
+    'IV_HV_Ratio': 1.0,
+    'Skew_30d': 0.0,
+    'Kurt_30d': 0.0,
+    'Drawdown': 0.0,
+    'Vol_Spike': 0.0,
+    'Cum_Returns_30d': 0.0,
+    'Month': 1,
+    'Quarter': 1,
+    'DayOfWeek': 0,
+}
+
 class OptionModel:
     def __init__(self, model_path='best_multitask_svi.pth'):
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
@@ -89,30 +104,32 @@ class OptionModel:
             
             ⚠️ Для получения Gamma/Theta/Price используйте black_scholes_safe()!
         """
-        data = []
-        spot = market_state['underlying_price']
-        
-        for K in strikes:
-            # Create input row
-            row = {
-                'log_moneyness': np.log(spot / K),
-                'dte': dte_days, # Model trained on days, not years
-                'is_call': 1.0 if is_call else 0.0,
-                'Real_IV_ATM': market_state.get('Real_IV_ATM', 0.5),
-                'HV_30d': market_state.get('HV_30d', 0.5),
-                'IV_HV_Ratio': market_state.get('IV_HV_Ratio', 1.0),
-                'Skew_30d': market_state.get('Skew_30d', 0.0),
-                'Kurt_30d': market_state.get('Kurt_30d', 0.0),
-                'Drawdown': market_state.get('Drawdown', 0.0),
-                'Vol_Spike': market_state.get('Vol_Spike', 0.0),
-                'Cum_Returns_30d': market_state.get('Cum_Returns_30d', 0.0),
-                'Month': market_state.get('Month', 1),
-                'Quarter': market_state.get('Quarter', 1),
-                'DayOfWeek': market_state.get('DayOfWeek', 0)
-            }
-            data.append(row)
-            
-        df_input = pd.DataFrame(data)
+        n = len(strikes)
+        return self.predict_batch([market_state] * n, strikes, np.full(n, dte_days), is_call=is_call)
+
+    def predict_batch(self, market_states, strikes, dte_days, is_call=True):
+        """
+        predict() for aligned rows (market_state[i], strikes[i], dte_days[i]).
+        
+        Scales and runs the network once for all rows, e.g. one strike across
+        a whole price history instead of one forward pass per date.
+        
+        Returns:
+        --------
+        pd.DataFrame: ['strike', 'mark_iv', 'delta', 'vega'], one row per input row
+        """
+        # Float copy for the features only; the output keeps the caller's strikes (and dtype)
+        strikes_f = np.asarray(strikes, dtype=float)
+        spot = np.array([state['underlying_price'] for state in market_states], dtype=float)
+        
+        columns = {
+            'log_moneyness': np.log(spot / strikes_f),
+            'dte': np.asarray(dte_days), # Model trained on days, not years
+            'is_call': np.full(len(strikes_f), 1.0 if is_call else 0.0),
+        }
+        for name, default in STATE_FEATURE_DEFAULTS.items():
+            columns[name] = [state.get(name, default) for state in market_states]
+        df_input = pd.DataFrame(columns)
         
         # Ensure correct column order
         df_input = df_input[self.input_features]
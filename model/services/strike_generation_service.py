@@ -86,8 +86,7 @@ class StrikeGenerationService:
             )
             
             # Convert indices to strikes
-            table = GridEngine.generate_table()
-            return sorted([int(table[idx]) for idx in final_indices if idx < len(table)])
+            return GridEngine.indices_to_strikes(final_indices)
         
         # Fallback: single-day parabolic
         from strikes import parabolic_distribution_cached, CONFIG
@@ -111,8 +110,7 @@ class StrikeGenerationService:
             step = CONFIG.MAGNET_STEP_SHORT
         
         filtered = {(idx // step) * step for idx in raw_indices}
-        table = GridEngine.generate_table()
-        return sorted([int(table[idx]) for idx in filtered if idx < len(table)])
+        return GridEngine.indices_to_strikes(filtered)
     
     def get_expirations(self, current_date: datetime) -> List[Tuple[datetime, int]]:
         """
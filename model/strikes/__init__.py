@@ -62,7 +62,9 @@ from .magnets import (
     LayerBoundaries,
     compute_layer_boundaries,
     apply_magnet_filter,
-    filter_new_strikes_only
+    filter_new_strikes_only,
+    mask_from_ids,
+    ids_from_mask
 )
 from .simulation import (
     ContractDNA,
@@ -97,6 +99,8 @@ __all__ = [
     'compute_layer_boundaries',
     'apply_magnet_filter',
     'filter_new_strikes_only',
+    'mask_from_ids',
+    'ids_from_mask',
     
     # Simulation
     'ContractDNA',
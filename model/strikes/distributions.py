@@ -12,7 +12,103 @@ from functools import lru_cache
 from typing import List, Tuple
 
 from .config import CONFIG
-from .grid_engine import GridEngine
+from .grid_engine import GridEngine, _nearest_indices
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # Optional: the pure-Python walk is used without it
+    HAS_NUMBA = False
+
+
+MAX_WALK_ITERATIONS = 10000
+
+
+def _skip(distance, max_range, base_skip, steepness, power):
+    """Шаг на расстоянии distance от центра (растет при удалении от центра)."""
+    if max_range == 0:
+        return base_skip
+    norm_dist = distance / max_range
+    factor = 1 + steepness * (norm_dist ** power)
+    return max(1, int(base_skip * factor))
+
+
+def _walk_parabola(center_index, range_down, range_up, max_range, base_skip, steepness, power, table_size):
+    """
+    Индексы параболической сетки: центр, шаги вниз до range_down, шаги вверх до range_up.
+    
+    Отдельная функция без замыканий, чтобы Numba компилировала ее целиком.
+    Возвращает индексы в порядке обхода (вниз, затем вверх).
+    """
+    size = 1 + min(max(range_down, 0), MAX_WALK_ITERATIONS) + min(max(range_up, 0), MAX_WALK_ITERATIONS)
+    out = np.empty(size, np.int64)
+    out[0] = center_index
+    n = 1
+    
+    # Генерация вниз
+    current_idx = center_index
+    for _ in range(MAX_WALK_ITERATIONS):
+        distance_from_center = center_index - current_idx
+        if distance_from_center >= range_down:
+            break
+        current_idx -= _skip(distance_from_center, max_range, base_skip, steepness, power)
+        if current_idx >= 0:
+            out[n] = current_idx
+            n += 1
+        else:
+            break
+    
+    # Генерация вверх
+    current_idx = center_index
+    for _ in range(MAX_WALK_ITERATIONS):
+        distance_from_center = current_idx - center_index
+        if distance_from_center >= range_up:
+            break
+        current_idx += _skip(distance_from_center, max_range, base_skip, steepness, power)
+        if current_idx < table_size:
+            out[n] = current_idx
+            n += 1
+        else:
+            break
+    
+    return out[:n]
+
+
+def _walk_parabola_numpy(center_index, range_down, range_up, max_range, base_skip, steepness, power, table_size):
+    """
+    _walk_parabola() without Numba: every skip computed in one NumPy pass, then the walk is lookups.
+    
+    Each step depends on the distance reached by the previous one, so the walk
+    itself is a recurrence (not a cumsum over consecutive distances); only the
+    per-step arithmetic is vectorized.
+    """
+    if max_range > 0:
+        norm_dist = np.arange(max_range) / max_range
+        skips = np.maximum(1, (base_skip * (1 + steepness * norm_dist ** power)).astype(np.int64)).tolist()
+    else:
+        skips = []  # Both ranges <= 0: the walks stop immediately
+    
+    out = [center_index]
+    for sign, limit, in_table in ((-1, range_down, lambda i: i >= 0), (1, range_up, lambda i: i < table_size)):
+        distance = 0
+        for _ in range(MAX_WALK_ITERATIONS):
+            if distance >= limit:
+                break
+            distance += skips[distance]
+            idx = center_index + sign * distance
+            if not in_table(idx):
+                break
+            out.append(idx)
+    return np.array(out, dtype=np.int64)
+
+
+if HAS_NUMBA:
+    # fastmath stays off: int() truncation of the skip must match the pure-Python walk exactly
+    _skip = njit(cache=True)(_skip)
+    _walk_parabola = njit(cache=True)(_walk_parabola)
+    _walk_parabola(10, 5, 5, 5, 1, 1.0, 2.0, 100)  # Compile (or load from cache) at import, not on first render
+else:
+    _walk_parabola = _walk_parabola_numpy
 
 
 @lru_cache(maxsize=512)  # ✅ BOUNDED для контроля памяти
@@ -38,6 +134,9 @@ def parabolic_distribution_cached(
         Параметры округляются перед кэшированием для лучшего hit rate.
         Bounded cache (maxsize=512) предотвращает неограниченный рост памяти.
     """
+    table = GridEngine.generate_table()
+    table_size = table.size
+    
     # Расчет теоретических границ
     years = max(1/365.0, current_dte / 365.0)
     time_factor = years ** CONFIG.PARABOLA_SIGMA_TIME_POWER
@@ -47,9 +146,8 @@ def parabolic_distribution_cached(
     price_down = current_spot * np.exp(-CONFIG.PARABOLA_SIGMA_MULTIPLIER * sigma_move)
     price_up = current_spot * np.exp(CONFIG.PARABOLA_SIGMA_MULTIPLIER * sigma_move)
     
-    # Конвертация в индексы
-    index_down = GridEngine.find_index(price_down)
-    index_up = GridEngine.find_index(price_up)
+    # Конвертация в индексы (оба края одним searchsorted по уже полученной таблице)
+    index_down, index_up = _nearest_indices(table, (price_down, price_up)).tolist()
     
     range_down = center_index - index_down
     range_up = index_up - center_index
@@ -59,51 +157,13 @@ def parabolic_distribution_cached(
     dte_normalized = current_dte / 365.0
     base_skip = max(1, int(1 + CONFIG.PARABOLA_DTE_DENSITY_MULTIPLIER * dte_normalized))
     
-    indices = set()
-    indices.add(center_index)
-    
-    # Функция расчета шага (растет при удалении от центра)
-    def get_skip(distance_from_center: int) -> int:
-        if max_range == 0:
-            return base_skip
-        norm_dist = distance_from_center / max_range
-        factor = 1 + CONFIG.PARABOLA_STEEPNESS * (norm_dist ** CONFIG.PARABOLA_POWER)
-        return max(1, int(base_skip * factor))
-    
-    # Генерация вниз
-    current_idx = center_index
-    table_size = len(GridEngine.generate_table())
-    max_iterations = 10000
-    
-    iteration = 0
-    while iteration < max_iterations:
-        distance_from_center = center_index - current_idx
-        if distance_from_center >= range_down:
-            break
-        skip = get_skip(distance_from_center)
-        current_idx -= skip
-        if current_idx >= 0:
-            indices.add(current_idx)
-        else:
-            break
-        iteration += 1
-    
-    # Генерация вверх
-    current_idx = center_index
-    iteration = 0
-    while iteration < max_iterations:
-        distance_from_center = current_idx - center_index
-        if distance_from_center >= range_up:
-            break
-        skip = get_skip(distance_from_center)
-        current_idx += skip
-        if current_idx < table_size:
-            indices.add(current_idx)
-        else:
-            break
-        iteration += 1
+    indices = _walk_parabola(
+        center_index, range_down, range_up, max_range, base_skip,
+        float(CONFIG.PARABOLA_STEEPNESS), float(CONFIG.PARABOLA_POWER), table_size
+    )
     
-    return tuple(sorted(indices))
+    # Down and up sides never overlap, so a sort is enough
+    return tuple(np.sort(indices).tolist())
 
 
 def parabolic_distribution(
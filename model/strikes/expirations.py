@@ -6,8 +6,10 @@ Deribit-standard expiration generation and contract birth date calculation.
 Implements exchange-specific logic for daily, weekly, monthly, and quarterly expirations.
 """
 
-import numpy as np
+import bisect
+import math
 import calendar
+from functools import lru_cache
 import pandas as pd  
 from datetime import datetime, timedelta
 from typing import Tuple, List
@@ -15,6 +17,7 @@ from typing import Tuple, List
 from .config import CONFIG
 
 
+@lru_cache(maxsize=1024)
 def get_last_friday(year: int, month: int) -> datetime:
     """
     Возвращает дату последней пятницы месяца.
@@ -32,6 +35,11 @@ def get_last_friday(year: int, month: int) -> datetime:
     return last_date - timedelta(days=offset)
 
 
+# Upper bounds of normalized mantissa -> nice value (1, 2, 2.5, 5, 10)
+_NICE_THRESHOLDS = (1.485, 2.2275, 3.7125, 7.425)
+_NICE_VALUES = (1.0, 2.0, 2.5, 5.0, 10.0)
+
+
 def round_to_nice_tick(value: float) -> float:
     """
     Округление к биржевым тикам (nice numbers).
@@ -47,22 +55,12 @@ def round_to_nice_tick(value: float) -> float:
     """
     if value <= 1e-9:
         return 0.0
-    magnitude = 10 ** np.floor(np.log10(value))
-    normalized = value / magnitude
-    
-    if normalized < 1.485:
-        nice = 1.0
-    elif normalized < 2.2275:
-        nice = 2.0
-    elif normalized < 3.7125:
-        nice = 2.5
-    elif normalized < 7.425:
-        nice = 5.0
-    else:
-        nice = 10.0
+    # Scalar math/bisect: np.log10 on a Python float pays full ufunc dispatch
+    magnitude = 10.0 ** math.floor(math.log10(value))
+    nice = _NICE_VALUES[bisect.bisect_right(_NICE_THRESHOLDS, value / magnitude)]
     
     result = nice * magnitude
-    return round(result) if result >= 1 else round(result, -int(np.floor(np.log10(result))) + 2)
+    return round(result) if result >= 1 else round(result, -math.floor(math.log10(result)) + 2)
 
 
 def generate_deribit_expirations(current_date: datetime) -> List[Tuple[datetime, int]]:
@@ -85,6 +83,16 @@ def generate_deribit_expirations(current_date: datetime) -> List[Tuple[datetime,
         - Quarterlies (последние пятницы марта, июня, сентября, декабря)
     """
     curr = current_date.replace(hour=8, minute=0, second=0, microsecond=0)
+    return list(_expirations_for_day(curr))
+
+
+@lru_cache(maxsize=256)
+def _expirations_for_day(curr: datetime) -> Tuple[Tuple[datetime, int], ...]:
+    """
+    generate_deribit_expirations() для даты, уже приведенной к 08:00 (кэшируется).
+    
+    Набор зависит только от дня, а вызывается на каждый рендер.
+    """
     exp_counts = {} 
 
     # Dailies: следующие 4 дня
@@ -119,7 +127,7 @@ def generate_deribit_expirations(current_date: datetime) -> List[Tuple[datetime,
                 exp_counts.setdefault(d, set()).add('quarterly')
 
     sorted_dates = sorted(exp_counts.keys())[:24]
-    return [(d, len(exp_counts[d])) for d in sorted_dates]
+    return tuple((d, len(exp_counts[d])) for d in sorted_dates)
 
 
 def get_birth_date(exp_date) -> Tuple[datetime, int]:
@@ -7,12 +7,46 @@ The GridEngine provides a foundation table of all possible strikes
 with steps that grow proportionally to price level.
 """
 
+import math
 import numpy as np
+from functools import lru_cache
 from typing import List, Optional
 
 from .config import CONFIG
 
 
+@lru_cache(maxsize=1024)
+def _step_for_price(price: float, threshold_low: float, threshold_high: float,
+                    low_multiplier: float, high_multiplier: float) -> float:
+    """
+    GridEngine.get_step() на скалярной math (без 0-d массивов NumPy), кэшируется.
+    
+    Параметры CONFIG входят в ключ кэша, поэтому их переопределение в рантайме учитывается.
+    """
+    if price <= 1e-9:
+        return 0.000001
+    
+    exponent = math.floor(math.log10(price))
+    magnitude = 10.0 ** exponent
+    normalized = round(price / magnitude, 6)
+    
+    if normalized < threshold_low:
+        return magnitude * low_multiplier
+    elif normalized < threshold_high:
+        return magnitude * high_multiplier
+    else:
+        return magnitude * high_multiplier
+
+
+def _nearest_indices(table: np.ndarray, prices) -> np.ndarray:
+    """Индексы ближайших к prices страйков table (при равенстве - правый, как find_index)."""
+    prices = np.asarray(prices, dtype=np.float64)
+    idx = np.clip(np.searchsorted(table, prices), 1, table.size - 1)
+    left = idx - 1
+    pick_left = np.abs(table[left] - prices) < np.abs(table[idx] - prices)
+    return np.where(pick_left, left, idx)
+
+
 class GridEngine:
     """
     Базовая сетка страйков с адаптивным шагом.
@@ -27,7 +61,7 @@ class GridEngine:
         >>> table[571]
         100000.0
     """
-    _table_cache: Optional[List[float]] = None
+    _table_cache: Optional[np.ndarray] = None
     
     @staticmethod
     def get_step(price: float) -> float:
@@ -44,22 +78,14 @@ class GridEngine:
             Шаг растет логарифмически с ценой для обеспечения
             одинаковой относительной плотности на всех уровнях.
         """
-        if price <= 1e-9:
-            return 0.000001
-        
-        exponent = np.floor(np.log10(price))
-        magnitude = 10 ** exponent
-        normalized = round(price / magnitude, 6)
-        
-        if normalized < CONFIG.GRID_THRESHOLD_LOW:
-            return magnitude * CONFIG.GRID_STEP_LOW_MULTIPLIER
-        elif normalized < CONFIG.GRID_THRESHOLD_HIGH:
-            return magnitude * CONFIG.GRID_STEP_HIGH_MULTIPLIER
-        else:
-            return magnitude * CONFIG.GRID_STEP_HIGH_MULTIPLIER
+        return _step_for_price(
+            float(price),
+            CONFIG.GRID_THRESHOLD_LOW, CONFIG.GRID_THRESHOLD_HIGH,
+            CONFIG.GRID_STEP_LOW_MULTIPLIER, CONFIG.GRID_STEP_HIGH_MULTIPLIER
+        )
     
     @classmethod
-    def generate_table(cls, min_price: float = 100, max_price: float = 5000000) -> List[float]:
+    def generate_table(cls, min_price: float = 100, max_price: float = 5000000) -> np.ndarray:
         """
         Генерирует полную таблицу страйков (кэшируется).
         
@@ -68,33 +94,56 @@ class GridEngine:
             max_price: Максимальная цена
             
         Returns:
-            Список всех страйков в диапазоне
+            Все страйки в диапазоне (float64 ndarray, по возрастанию)
             
         Note:
-            Результат кэшируется в _table_cache для переиспользования.
+            Результат кэшируется в _table_cache для переиспользования,
+            поэтому searchsorted/fancy-indexing не конвертируют список на каждом вызове.
             Максимум 100k элементов для ограничения памяти.
         """
         if cls._table_cache is not None:
             return cls._table_cache
         
-        strikes = []
         first_step = cls.get_step(min_price)
-        current = np.ceil(min_price / first_step) * first_step
+        current = math.ceil(min_price / first_step) * first_step
         current = float(f"{current:.8g}")
         
-        while current <= max_price:
-            strikes.append(current)
+        # The step only changes at band edges (magnitude * threshold), so the table is
+        # a handful of constant-step runs, each one np.arange instead of a Python walk
+        runs = []
+        count = 0
+        while current <= max_price and count <= 100000:
             step = cls.get_step(current)
-            current += step
-            current = float(f"{current:.8g}")
+            exponent = math.floor(math.log10(current))
+            magnitude = 10.0 ** exponent
+            normalized = round(current / magnitude, 6)
+            edge_norm = next(t for t in (CONFIG.GRID_THRESHOLD_LOW, CONFIG.GRID_THRESHOLD_HIGH, 10.0) if normalized < t)
+            edge = min(magnitude * edge_norm, max_price + step)  # Exclusive end of this run
             
-            if len(strikes) > 100000:
-                break
+            n = max(1, int(np.ceil((edge - current) / step - 1e-6)))
+            # Same 8 significant digits the stepwise walk kept
+            run = np.round(current + np.arange(n) * step, 7 - exponent)
+            runs.append(run[run <= max_price])
+            count += n
+            current = float(f"{current + n * step:.8g}")
+        
+        strikes = np.concatenate(runs)[:100001] if runs else np.empty(0, dtype=np.float64)
         
         cls._table_cache = strikes
         return strikes
     
     @classmethod
+    def indices_to_strikes(cls, indices) -> List[int]:
+        """
+        Отсортированные целые страйки для индексов таблицы (индексы вне таблицы отбрасываются).
+        """
+        table = cls.generate_table()
+        idx = np.fromiter(indices, dtype=np.int64)
+        idx = idx[idx < table.size]
+        return np.sort(table[idx].astype(np.int64)).tolist()
+    
+    @classmethod
+    @lru_cache(maxsize=4096)
     def find_index(cls, price: float) -> int:
         """
         Находит индекс ближайшего страйка для заданной цены.
@@ -110,15 +159,28 @@ class GridEngine:
             572  # Индекс ближайшего страйка
         """
         table = cls.generate_table()
-        idx = np.searchsorted(table, price)
+        idx = int(np.searchsorted(table, price))
         
         if idx == 0:
             return 0
-        elif idx == len(table):
-            return len(table) - 1
+        elif idx == table.size:
+            return table.size - 1
         else:
             # Выбираем ближайший
             if abs(table[idx-1] - price) < abs(table[idx] - price):
                 return idx - 1
             else:
                 return idx
+    
+    @classmethod
+    def find_indices(cls, prices) -> np.ndarray:
+        """
+        Векторная версия find_index: индексы ближайших страйков для массива цен.
+        
+        Args:
+            prices: Массив цен
+            
+        Returns:
+            Массив индексов (int64), поэлементно совпадает с find_index
+        """
+        return _nearest_indices(cls.generate_table(), prices)
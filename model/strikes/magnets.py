@@ -8,12 +8,18 @@ ensuring stability and reducing strike proliferation.
 """
 
 import numpy as np
-from typing import Set, List
+from typing import Iterable, Set, List, Tuple, Union
 from dataclasses import dataclass
 
 from .config import CONFIG
 from .grid_engine import GridEngine
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # Optional: the NumPy snap is used without it
+    HAS_NUMBA = False
+
 
 def get_current_min_step(current_dte: int) -> int:
     """
@@ -33,6 +39,33 @@ def get_current_min_step(current_dte: int) -> int:
         return CONFIG.MAGNET_STEP_SHORT
 
 
+def _layer_steps(current_dte: int) -> Tuple[int, int, int]:
+    """Шаги магнита (Layer 1, Layer 2, Layer 3) для заданного DTE."""
+    min_step = get_current_min_step(current_dte)
+    return (
+        min_step,
+        max(CONFIG.LAYER2_MIN_STEP, min_step),
+        max(CONFIG.LAYER3_MIN_STEP, min_step),
+    )
+
+
+def mask_from_ids(ids: Iterable[int], n: int) -> np.ndarray:
+    """
+    Bool-маска длины n из индексов страйков (индексы вне [0, n) отбрасываются).
+    
+    Разность множеств над масками - один проход `a & ~b` без хеширования.
+    """
+    idx = np.fromiter(ids, dtype=np.int64)
+    mask = np.zeros(n, dtype=np.bool_)
+    mask[idx[(idx >= 0) & (idx < n)]] = True
+    return mask
+
+
+def ids_from_mask(mask: np.ndarray) -> Set[int]:
+    """Set индексов, отмеченных в маске."""
+    return set(np.flatnonzero(mask).tolist())
+
+
 @dataclass
 class LayerBoundaries:
     """Границы слоев для фильтрации."""
@@ -107,7 +140,7 @@ def compute_layer_boundaries(
 
 
 def apply_magnet_filter(
-    new_raw_indices: Set[int],
+    new_raw_indices: Union[Set[int], np.ndarray],
     boundaries: LayerBoundaries,
     step_l1: int,
     step_l2: int,
@@ -117,7 +150,7 @@ def apply_magnet_filter(
     Применяет магнитную фильтрацию к новым индексам.
     
     Args:
-        new_raw_indices: Новые сырые индексы для фильтрации
+        new_raw_indices: Новые сырые индексы (set или bool-маска по таблице)
         boundaries: Границы слоев
         step_l1: Шаг для Layer 1
         step_l2: Шаг для Layer 2
@@ -129,11 +162,14 @@ def apply_magnet_filter(
     Note:
         Использует numpy для векторизации вычислений.
     """
-    if not new_raw_indices:
-        return set()
+    # Конвертируем в numpy array (маска - одним flatnonzero)
+    if isinstance(new_raw_indices, np.ndarray):
+        new_raw_arr = np.flatnonzero(new_raw_indices)
+    else:
+        new_raw_arr = np.fromiter(new_raw_indices, dtype=np.int64)
     
-    # Конвертируем в numpy array
-    new_raw_arr = np.array(list(new_raw_indices), dtype=np.int32)
+    if new_raw_arr.size == 0:
+        return set()
     
     # Создаем маски для каждого слоя
     mask_l1 = (new_raw_arr >= boundaries.l1_low) & (new_raw_arr <= boundaries.l1_high)
@@ -158,8 +194,44 @@ def apply_magnet_filter(
     return approved
 
 
+def _snap_new_into_board(accumulated_mask, board_mask, l1_low, l1_high, l2_low, l2_high, step_l1, step_l2, step_l3):
+    """
+    Магнитирует новые сырые индексы (accumulated & ~board) прямо в board_mask.
+    
+    Маски - bool массивы длины таблицы. Эквивалентно apply_magnet_filter над
+    множеством новых индексов плюс объединение с доской, но без set.
+    Запись на месте безопасна: снап идет только вниз (j <= i), а индексы <= i
+    уже проверены.
+    """
+    for i in range(accumulated_mask.size):
+        if accumulated_mask[i] and not board_mask[i]:
+            if l1_low <= i <= l1_high:
+                step = step_l1
+            elif l2_low <= i <= l2_high:
+                step = step_l2
+            else:
+                step = step_l3
+            board_mask[(i // step) * step] = True
+
+
+def _snap_new_into_board_numpy(accumulated_mask, board_mask, l1_low, l1_high, l2_low, l2_high, step_l1, step_l2, step_l3):
+    """_snap_new_into_board() без Numba: те же маски слоев, что в apply_magnet_filter."""
+    new_raw_arr = np.flatnonzero(accumulated_mask & ~board_mask)
+    in_l1 = (new_raw_arr >= l1_low) & (new_raw_arr <= l1_high)
+    in_l2 = (new_raw_arr >= l2_low) & (new_raw_arr <= l2_high)
+    steps = np.where(in_l1, step_l1, np.where(in_l2, step_l2, step_l3))
+    board_mask[(new_raw_arr // steps) * steps] = True
+
+
+if HAS_NUMBA:
+    _snap_new_into_board = njit(cache=True)(_snap_new_into_board)
+    _snap_new_into_board(np.ones(4, np.bool_), np.zeros(4, np.bool_), 0, 1, 2, 3, 1, 2, 4)  # Compile at import
+else:
+    _snap_new_into_board = _snap_new_into_board_numpy
+
+
 def filter_new_strikes_only(
-    new_raw_indices: Set[int],
+    new_raw_indices: Union[Set[int], np.ndarray],
     price_history: List[float],
     current_day: int,
     birth_dte: int
@@ -168,7 +240,7 @@ def filter_new_strikes_only(
     Фильтрует ТОЛЬКО новые страйки через магнит.
     
     Args:
-        new_raw_indices: Новые сырые индексы (не из предыдущей доски)
+        new_raw_indices: Новые сырые индексы (не из предыдущей доски), set или bool-маска
         price_history: История цен
         current_day: Текущий день
         birth_dte: DTE при рождении
@@ -180,16 +252,14 @@ def filter_new_strikes_only(
         Старые страйки защищены персистентностью в generate_daily_board.
     """
     # Early exit если нет новых индексов
-    if not new_raw_indices:
+    if isinstance(new_raw_indices, np.ndarray):
+        if not new_raw_indices.any():
+            return set()
+    elif not new_raw_indices:
         return set()
     
     # Вычисляем шаги
-    current_dte = birth_dte - current_day
-    min_step = get_current_min_step(current_dte)
-    
-    step_l1 = min_step
-    step_l2 = max(CONFIG.LAYER2_MIN_STEP, min_step)
-    step_l3 = max(CONFIG.LAYER3_MIN_STEP, min_step)
+    step_l1, step_l2, step_l3 = _layer_steps(birth_dte - current_day)
     
     # Вычисляем границы слоев
     boundaries = compute_layer_boundaries(price_history, current_day)
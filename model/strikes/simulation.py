@@ -6,12 +6,20 @@ Simulates the evolution of strike boards over time with accumulation strategy.
 Implements incremental strike generation from contract birth through expiration.
 """
 
+import numpy as np
 from typing import List, Set, Tuple, Optional
 from dataclasses import dataclass, field
 
 from .grid_engine import GridEngine
 from .distributions import parabolic_distribution
-from .magnets import filter_new_strikes_only
+from .magnets import (
+    filter_new_strikes_only,
+    compute_layer_boundaries,
+    mask_from_ids,
+    ids_from_mask,
+    _layer_steps,
+    _snap_new_into_board
+)
 
 
 @dataclass
@@ -56,19 +64,23 @@ def generate_accumulated_strikes_stateless(
     Note:
         Функция stateless: одинаковые входы дают одинаковый результат.
         Используется для api compatibility и ad-hoc запросов.
+        Дневные индексы объединяются одним np.unique по int32 массиву, без set.update по дням.
     """
-    all_raw_indices = set()
+    centers = GridEngine.find_indices(np.asarray(price_history[:current_day + 1])).tolist()
+    daily_arrays = []
     
     for day in range(0, current_day + 1):
         dte_on_day = dna.birth_dte - day
         spot_on_day = price_history[day]
         iv_on_day = iv_history[day]
-        center_on_day = GridEngine.find_index(spot_on_day)
+        center_on_day = centers[day]
         
         daily_indices = parabolic_distribution(center_on_day, spot_on_day, iv_on_day, dte_on_day)
-        all_raw_indices.update(daily_indices)
+        daily_arrays.append(np.array(daily_indices, dtype=np.int32))
     
-    return all_raw_indices
+    if not daily_arrays:
+        return set()
+    return set(np.unique(np.concatenate(daily_arrays)).tolist())
 
 
 def generate_daily_board(
@@ -100,15 +112,16 @@ def generate_daily_board(
         dna, price_history, iv_history, current_day
     )
     
-    # Определяем новые
+    # Определяем новые: разность множеств как accumulated & ~previous над масками
     if previous_final_strikes is None:
         previous_final_strikes = set()
     
-    new_raw_indices = all_raw_indices - previous_final_strikes
+    table_size = GridEngine.generate_table().size
+    new_raw_mask = mask_from_ids(all_raw_indices, table_size) & ~mask_from_ids(previous_final_strikes, table_size)
     
     # Фильтруем новые
     new_approved = filter_new_strikes_only(
-        new_raw_indices,
+        new_raw_mask,
         price_history,
         current_day,
         dna.birth_dte
@@ -141,37 +154,38 @@ def simulate_board_evolution(
     Note:
         Это ОСНОВНАЯ функция для production использования.
         Использует incremental accumulation для максимальной скорости.
+        Членство хранится в bool-масках длины таблицы вместо set: разность и
+        магнит - один проход _snap_new_into_board (Numba, если установлена).
     """
     history = []
     previous_final = None
-    accumulated_raw = set()  # Инкрементальное накопление
+    table_size = GridEngine.generate_table().size
+    accumulated_mask = np.zeros(table_size, dtype=np.bool_)  # Инкрементальное накопление
+    board_mask = np.zeros(table_size, dtype=np.bool_)
+    # Центры всех дней одним searchsorted
+    centers = GridEngine.find_indices(np.asarray(price_history[:target_day + 1])).tolist()
     
     for day in range(0, target_day + 1):
         # Добавляем ТОЛЬКО текущий день к накопленным
         dte_on_day = dna.birth_dte - day
         spot_on_day = price_history[day]
         iv_on_day = iv_history[day]
-        center_on_day = GridEngine.find_index(spot_on_day)
+        center_on_day = centers[day]
         
         daily_indices = parabolic_distribution(center_on_day, spot_on_day, iv_on_day, dte_on_day)
-        accumulated_raw.update(daily_indices)
+        accumulated_mask[daily_indices] = True
         
-        # Фильтрация
-        if previous_final is None:
-            previous_final = set()
+        # Фильтрация только новых (accumulated - previous_final); старые защищены персистентностью
+        if (accumulated_mask & ~board_mask).any():
+            b = compute_layer_boundaries(price_history, day)
+            step_l1, step_l2, step_l3 = _layer_steps(dna.birth_dte - day)
+            _snap_new_into_board(
+                accumulated_mask, board_mask,
+                b.l1_low, b.l1_high, b.l2_low, b.l2_high,
+                step_l1, step_l2, step_l3
+            )
         
-        new_raw_indices = accumulated_raw - previous_final
-        
-        new_approved = filter_new_strikes_only(
-            new_raw_indices,
-            price_history[:day+1],
-            day,
-            dna.birth_dte
-        )
-        
-        current_board = previous_final | new_approved
-        
-        history.append(current_board)
-        previous_final = current_board
+        previous_final = ids_from_mask(board_mask)
+        history.append(previous_final)
     
     return previous_final, history
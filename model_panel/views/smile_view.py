@@ -10,8 +10,6 @@ import param
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-from scipy.interpolate import make_interp_spline
 
 import sys
 import os
@@ -20,6 +18,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.theme import CUSTOM_CSS, CHART_THEME, apply_chart_theme
 
 
+# plotly.express.colors.qualitative.Plotly, inlined so plotly.express is never imported
+_COLORS = ('#636EFA', '#EF553B', '#00CC96', '#AB63FA', '#FFA15A',
+           '#19D3F3', '#FF6692', '#B6E880', '#FF97FF', '#FECB52')
+
+
 class SmileView(pn.viewable.Viewer):
     """Volatility Smile chart view."""
     
@@ -50,15 +53,15 @@ class SmileView(pn.viewable.Viewer):
         df_view = df[df['dte'].isin(selected_dte_ints)]
         
         # Plot just Calls IV (standard convention for Smile)
-        df_plot = df_view[df_view['type'] == 'call'].copy()
+        df_plot = df_view.loc[df_view['type'] == 'call', ['strike', 'mark_iv', 'dte']]
         
         if df_plot.empty:
             return self._empty_message("No call option data for selected expirations")
         
         fig = go.Figure()
-        colors = px.colors.qualitative.Plotly
+        colors = _COLORS
         
-        dtes = sorted(df_plot['dte'].unique())
+        dtes = np.unique(df_plot['dte'].to_numpy())  # Sorted unique in one pass
         for i, dte in enumerate(dtes):
             df_dte = df_plot[df_plot['dte'] == dte].sort_values('strike')
             color = colors[i % len(colors)]
@@ -79,6 +82,7 @@ class SmileView(pn.viewable.Viewer):
                     x = df_dte['strike'].values
                     y = df_dte['mark_iv'].values
                     x_new = np.linspace(x.min(), x.max(), 200)
+                    from scipy.interpolate import make_interp_spline  # Deferred: only needed for >= 4 points
                     spl = make_interp_spline(x, y, k=3)
                     fig.add_trace(go.Scatter(
                         x=x_new, 
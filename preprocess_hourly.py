@@ -11,6 +11,20 @@ OUTPUT_DIR = "processed_snapshots"
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+def add_derived_columns(df):
+    """
+    Adds the analyzer's derived columns as categoricals (stored dictionary-encoded).
+    Derived from unique values only, so readers no longer recompute them per load.
+    """
+    symbols = df['symbol'].unique()
+    currency_lut = {s: s.split('-', 1)[0] for s in symbols}
+    df['currency'] = df['symbol'].map(currency_lut).astype('category')
+
+    expirations = df['expiration'].unique()
+    labels = pd.to_datetime(expirations, unit='us').strftime('%d%b%y').str.upper()
+    df['expiration_str'] = df['expiration'].map(dict(zip(expirations, labels))).astype('category')
+    return df
+
 def preprocess_month(year, month, logger=None):
     """
     Optimized monthly processing. 
@@ -101,12 +115,12 @@ def preprocess_month(year, month, logger=None):
     # Final cleanup and save
     if btc_snapshots:
         out_btc = os.path.join(OUTPUT_DIR, f"BTC_{year}-{month:02d}.parquet")
-        pd.concat(btc_snapshots, ignore_index=True).to_parquet(out_btc, compression='snappy')
+        add_derived_columns(pd.concat(btc_snapshots, ignore_index=True)).to_parquet(out_btc, compression='snappy')
         log(f"\n✅ Created {out_btc}")
     
     if eth_snapshots:
         out_eth = os.path.join(OUTPUT_DIR, f"ETH_{year}-{month:02d}.parquet")
-        pd.concat(eth_snapshots, ignore_index=True).to_parquet(out_eth, compression='snappy')
+        add_derived_columns(pd.concat(eth_snapshots, ignore_index=True)).to_parquet(out_eth, compression='snappy')
         log(f"✅ Created {out_eth}")
 
 if __name__ == "__main__":